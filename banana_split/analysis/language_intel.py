@@ -7,33 +7,39 @@ and symbols so that heuristics can group related hunks more effectively.
 
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Optional
 
-
+_LANGUAGE_BY_EXTENSION = {
+    "py": "python",
+    "js": "javascript",
+    "mjs": "javascript",
+    "cjs": "javascript",
+    "ts": "typescript",
+    "tsx": "typescript",
+    "go": "go",
+    "java": "java",
+    "rb": "ruby",
+    "rs": "rust",
+}
+
+
+@lru_cache(maxsize=8192)
 def detect_language(path: str) -> Optional[str]:
     """
     Guess the language for a file path based on its extension.
+
+    Results are memoized; the same paths recur across diffs and
+    evaluation cases.
     """
 
-    lower = path.lower()
-    if lower.endswith(".py"):
-        return "python"
-    if lower.endswith(".js") or lower.endswith(".mjs") or lower.endswith(".cjs"):
-        return "javascript"
-    if lower.endswith(".ts") or lower.endswith(".tsx"):
-        return "typescript"
-    if lower.endswith(".go"):
-        return "go"
-    if lower.endswith(".java"):
-        return "java"
-    if lower.endswith(".rb"):
-        return "ruby"
-    if lower.endswith(".rs"):
-        return "rust"
-
-    return None
+    _, dot, extension = path.rpartition(".")
+    if not dot:
+        return None
+    return _LANGUAGE_BY_EXTENSION.get(extension.lower())
 
 
+@lru_cache(maxsize=8192)
 def extract_symbol_name_from_hunk_header(header: str) -> Optional[str]:
     """
     Attempt to extract a symbol name (e.g., function or method) from a
@@ -45,10 +51,10 @@ def extract_symbol_name_from_hunk_header(header: str) -> Optional[str]:
     """
 
     # Placeholder: rely on the trailing text after the final '@@'.
-    parts = header.split("@@")
-    if len(parts) < 3:
+    before, sep, tail = header.rpartition("@@")
+    if not sep or "@@" not in before:
         return None
-    tail = parts[-1].strip()
+    tail = tail.strip()
     return tail or None
 
 
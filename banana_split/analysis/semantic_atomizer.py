@@ -8,13 +8,21 @@ dependencies.
 
 from __future__ import annotations
 
+import heapq
+import re
+from collections import defaultdict
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Set, Tuple
 
 from ..domain import AtomicChange, Diff, DiffHunk
 from .language_intel import detect_language
 
+# Any path mentioning "test" (tests/ directories, test_*.py, *_test.py,
+# ...) counts as a test, as do TypeScript spec files.
+_TEST_PATH_RE = re.compile(r"test|\.spec\.ts$", re.IGNORECASE)
+
 
 @dataclass
 class _SemanticNode:
@@ -22,11 +30,29 @@ class _SemanticNode:
     Internal semantic unit used before conversion to AtomicChange.
     """
 
+    # Declared by hand rather than via dataclass(slots=True) to keep
+    # Python 3.9 support.
+    __slots__ = (
+        "idx",
+        "id",
+        "file_path",
+        "symbol",
+        "normalized_symbol",
+        "module_key",
+        "hunk_ids",
+        "tags",
+        "summary",
+        "first_order",
+    )
+
+    idx: int
     id: str
     file_path: str
     symbol: Optional[str]
+    normalized_symbol: Optional[str]
+    module_key: Optional[str]
     hunk_ids: List[str]
-    tags: Set[str]
+    tags: FrozenSet[str]
     summary: Optional[str]
     first_order: int
 
@@ -42,50 +68,97 @@ def atomize_semantically(diff: Diff) -> List[AtomicChange]:
       - topologically order units using those dependencies.
     """
 
-    hunk_order = _build_hunk_order(diff)
-    nodes, by_file, by_symbol, by_module = _build_nodes(diff, hunk_order)
-    if not nodes:
-        return []
-
-    edges = _build_dependencies(nodes, by_file, by_symbol, by_module)
-    ordered_nodes = _topological_sort(nodes, edges)
-
+    kinds = {_path_info(path).is_test for path, _ in _iter_file_hunks(diff)}
+    if len(kinds) < 2:
+        # All-source or all-test diffs cannot have source -> test links,
+        # so diff order stands and the node graph can be skipped entirely.
+        return _build_changes_in_diff_order(diff)
+
+    nodes, by_file, source_by_symbol, source_by_module = _build_nodes(diff)
+
+    # Nodes are built in diff order, which already satisfies the intra-file
+    # dependencies. Only source -> test links can reorder them, and those
+    # need both linkable sources and at least one test node.
+    ordered_nodes = nodes
+    has_sources = bool(source_by_symbol or source_by_module)
+    if len(nodes) > 1 and has_sources and any("test" in node.tags for node in nodes):
+        edges = _build_dependencies(nodes, by_file, source_by_symbol, source_by_module)
+        ordered_nodes = _topological_sort(nodes, edges)
+
+    # Nodes are discarded after this point, so their containers are handed
+    # over to the atomic changes instead of being copied.
     return [
         AtomicChange(
             id=node.id,
-            hunk_ids=list(node.hunk_ids),
-            tags=set(node.tags),
+            hunk_ids=node.hunk_ids,
+            tags=node.tags,
             summary=node.summary,
         )
         for node in ordered_nodes
     ]
 
 
-def _build_hunk_order(diff: Diff) -> Dict[str, int]:
-    order: Dict[str, int] = {}
-    i = 0
+def _iter_file_hunks(diff: Diff) -> Iterator[Tuple[str, List[DiffHunk]]]:
     for file in diff.files:
-        for hunk in file.hunks:
-            order[hunk.id] = i
-            i += 1
-    return order
+        path = file.path_new or file.path_old or ""
+        if file.hunks and path:
+            yield path, file.hunks
+
 
+def _build_changes_in_diff_order(diff: Diff) -> List[AtomicChange]:
+    """
+    Build atomic changes directly, in diff order, without semantic nodes.
+
+    Produces the same changes as the node-based path when no reordering
+    is possible.
+    """
+
+    changes: List[AtomicChange] = []
+    for path, hunks in _iter_file_hunks(diff):
+        common_tags = _path_info(path).tags
+        for idx, (symbol, _, group) in enumerate(_group_hunks_by_symbol(hunks)):
+            normalized_symbol = _normalize_symbol(symbol) if symbol else None
+            changes.append(
+                AtomicChange(
+                    id=f"{path}::ac{idx}",
+                    hunk_ids=[h.id for h in group],
+                    tags=_group_tags(common_tags, normalized_symbol),
+                    summary=_group_summary(path, symbol),
+                )
+            )
+    return changes
 
-def _build_nodes(
-    diff: Diff,
-    hunk_order: Dict[str, int],
-) -> Tuple[
+
+def _group_tags(common_tags: FrozenSet[str], normalized_symbol: Optional[str]) -> FrozenSet[str]:
+    if normalized_symbol:
+        return common_tags | {f"symbol:{normalized_symbol}"}
+    return common_tags
+
+
+def _group_summary(path: str, symbol: Optional[str]) -> str:
+    if symbol:
+        return f"Changes in {path} ({symbol})"
+    return f"Changes in {path}"
+
+
+def _build_nodes(diff: Diff) -> Tuple[
     List[_SemanticNode],
     Dict[str, List[_SemanticNode]],
-    Dict[str, List[_SemanticNode]],
-    Dict[str, List[_SemanticNode]],
+    Dict[str, List[int]],
+    Dict[str, List[int]],
 ]:
     nodes: List[_SemanticNode] = []
     by_file: Dict[str, List[_SemanticNode]] = {}
-    by_symbol: Dict[str, List[_SemanticNode]] = {}
-    by_module: Dict[str, List[_SemanticNode]] = {}
+    # Non-test node indexes keyed by symbol/module, used to link tests to
+    # the sources they exercise.
+    source_by_symbol: Dict[str, List[int]] = {}
+    source_by_module: Dict[str, List[int]] = {}
+    # Global position of the first hunk of the current file in diff order.
+    hunk_counter = 0
 
     for file in diff.files:
+        file_offset = hunk_counter
+        hunk_counter += len(file.hunks)
         if not file.hunks:
             continue
 
@@ -93,86 +166,92 @@ def _build_nodes(
         if not path:
             continue
 
-        tags = _base_tags_for_path(path)
+        path_info = _path_info(path)
+        module_key = path_info.module_key
+        common_tags = path_info.tags
         groups = _group_hunks_by_symbol(file.hunks)
         file_nodes: List[_SemanticNode] = []
 
-        for idx, (symbol, hunks) in enumerate(groups):
-            if not hunks:
-                continue
-
+        for idx, (symbol, first_index, hunks) in enumerate(groups):
             hunk_ids = [h.id for h in hunks]
-            node_tags = set(tags)
-            node_tags.add(f"path:{path}")
-            if symbol:
-                node_tags.add(f"symbol:{_normalize_symbol(symbol)}")
-
-            module_key = _module_key(path)
-            if module_key:
-                node_tags.add(f"module:{module_key}")
-
-            summary = f"Changes in {path}"
-            if symbol:
-                summary = f"Changes in {path} ({symbol})"
-
-            first_order = min(hunk_order[hid] for hid in hunk_ids)
+            normalized_symbol = _normalize_symbol(symbol) if symbol else None
+            node_tags = _group_tags(common_tags, normalized_symbol)
             node = _SemanticNode(
+                idx=len(nodes),
                 id=f"{path}::ac{idx}",
                 file_path=path,
                 symbol=symbol,
+                normalized_symbol=normalized_symbol,
+                module_key=module_key,
                 hunk_ids=hunk_ids,
                 tags=node_tags,
-                summary=summary,
-                first_order=first_order,
+                summary=_group_summary(path, symbol),
+                first_order=file_offset + first_index,
             )
             nodes.append(node)
             file_nodes.append(node)
 
-            normalized_symbol = _normalize_symbol(symbol) if symbol else None
+            if "test" in node_tags:
+                continue
+
             if normalized_symbol:
-                by_symbol.setdefault(normalized_symbol, []).append(node)
+                source_by_symbol.setdefault(normalized_symbol, []).append(node.idx)
 
             if module_key:
-                by_module.setdefault(module_key, []).append(node)
+                source_by_module.setdefault(module_key, []).append(node.idx)
 
         by_file[path] = file_nodes
 
-    return nodes, by_file, by_symbol, by_module
+    return nodes, by_file, source_by_symbol, source_by_module
 
 
-def _group_hunks_by_symbol(hunks: List[DiffHunk]) -> List[Tuple[Optional[str], List[DiffHunk]]]:
-    groups: Dict[Optional[str], List[DiffHunk]] = {}
-    order: List[Optional[str]] = []
+def _group_hunks_by_symbol(
+    hunks: List[DiffHunk],
+) -> List[Tuple[Optional[str], int, List[DiffHunk]]]:
+    """
+    Group a non-empty list of hunks by symbol, preserving first-seen order.
 
-    for hunk in hunks:
-        symbol: Optional[str] = None
-        meta_symbol = hunk.meta.get("symbol")
-        if isinstance(meta_symbol, str) and meta_symbol.strip():
-            symbol = meta_symbol.strip()
+    Each group is returned with the index of its first hunk in `hunks`.
+    """
 
-        if symbol not in groups:
-            groups[symbol] = []
-            order.append(symbol)
-        groups[symbol].append(hunk)
+    symbols = [_hunk_symbol(hunk) for hunk in hunks]
+    if symbols.count(symbols[0]) == len(symbols):
+        # Common case: the whole file is one group (often symbol-less).
+        return [(symbols[0], 0, list(hunks))]
 
-    return [(key, groups[key]) for key in order]
+    groups: Dict[Optional[str], Tuple[int, List[DiffHunk]]] = {}
+
+    for index, (symbol, hunk) in enumerate(zip(symbols, hunks)):
+        group = groups.get(symbol)
+        if group is None:
+            groups[symbol] = (index, [hunk])
+        else:
+            group[1].append(hunk)
+
+    return [(symbol, first_index, members) for symbol, (first_index, members) in groups.items()]
+
+
+def _hunk_symbol(hunk: DiffHunk) -> Optional[str]:
+    meta_symbol = hunk.meta.get("symbol")
+    if isinstance(meta_symbol, str):
+        return meta_symbol.strip() or None
+    return None
 
 
 def _build_dependencies(
     nodes: List[_SemanticNode],
     by_file: Dict[str, List[_SemanticNode]],
-    by_symbol: Dict[str, List[_SemanticNode]],
-    by_module: Dict[str, List[_SemanticNode]],
-) -> Dict[str, Set[str]]:
-    node_by_id = {node.id: node for node in nodes}
-    edges: Dict[str, Set[str]] = {node.id: set() for node in nodes}
+    source_by_symbol: Dict[str, List[int]],
+    source_by_module: Dict[str, List[int]],
+) -> Dict[int, Set[int]]:
+    # Outgoing edges keyed by _SemanticNode.idx; nodes without outgoing
+    # edges get no entry.
+    edges: Dict[int, Set[int]] = defaultdict(set)
 
     # Intra-file ordering dependencies.
     for file_nodes in by_file.values():
-        for idx in range(len(file_nodes) - 1):
-            src = file_nodes[idx].id
-            dst = file_nodes[idx + 1].id
-            edges[src].add(dst)
+        for prev, nxt in zip(file_nodes, file_nodes[1:]):
+            edges[prev.idx].add(nxt.idx)
 
     # Source -> test dependencies for matching symbols/modules.
     for node in nodes:
@@ -180,98 +259,89 @@ def _build_dependencies(
             continue
 
         # Prefer symbol-based linkage.
-        linked_sources: Set[str] = set()
-        if node.symbol:
-            symbol_key = _normalize_symbol(node.symbol)
-            for candidate in by_symbol.get(symbol_key, []):
-                if candidate.id == node.id:
-                    continue
-                if "test" in candidate.tags:
-                    continue
-                linked_sources.add(candidate.id)
+        linked_sources: Set[int] = set()
+        if node.normalized_symbol:
+            linked_sources.update(source_by_symbol.get(node.normalized_symbol, ()))
 
         # If symbol signal is missing, fall back to module name linkage.
-        if not linked_sources:
-            module_key = _module_key(node.file_path)
-            if module_key:
-                for candidate in by_module.get(module_key, []):
-                    if candidate.id == node.id:
-                        continue
-                    if "test" in candidate.tags:
-                        continue
-                    linked_sources.add(candidate.id)
+        if not linked_sources and node.module_key:
+            linked_sources.update(source_by_module.get(node.module_key, ()))
 
-        for source_id in linked_sources:
-            if source_id in node_by_id:
-                edges[source_id].add(node.id)
+        for source_idx in linked_sources:
+            edges[source_idx].add(node.idx)
 
     return edges
 
 
 def _topological_sort(
     nodes: List[_SemanticNode],
-    edges: Dict[str, Set[str]],
+    edges: Dict[int, Set[int]],
 ) -> List[_SemanticNode]:
-    node_by_id = {node.id: node for node in nodes}
-    indegree: Dict[str, int] = {node.id: 0 for node in nodes}
+    indegree = [0] * len(nodes)
 
+    forward_only = True
     for src, dsts in edges.items():
-        if src not in indegree:
-            continue
+        src_order = nodes[src].first_order
         for dst in dsts:
-            if dst in indegree:
-                indegree[dst] += 1
+            indegree[dst] += 1
+            if nodes[dst].first_order < src_order:
+                forward_only = False
 
-    ready = sorted(
-        [nid for nid, deg in indegree.items() if deg == 0],
-        key=lambda nid: node_by_id[nid].first_order,
-    )
-    ordered_ids: List[str] = []
-
-    while ready:
-        nid = ready.pop(0)
-        ordered_ids.append(nid)
-        for dst in sorted(
-            edges.get(nid, set()),
-            key=lambda x: node_by_id[x].first_order if x in node_by_id else 0,
-        ):
-            if dst not in indegree:
-                continue
+    if forward_only:
+        # When every edge already points forward in diff order, diff order
+        # is exactly what the heap below would produce.
+        return sorted(nodes, key=lambda n: n.first_order)
+
+    heap = [(nodes[idx].first_order, idx) for idx, deg in enumerate(indegree) if deg == 0]
+    heapq.heapify(heap)
+    ordered: List[_SemanticNode] = []
+
+    while heap:
+        _, idx = heapq.heappop(heap)
+        ordered.append(nodes[idx])
+        for dst in edges.get(idx, ()):
             indegree[dst] -= 1
             if indegree[dst] == 0:
-                ready.append(dst)
-        ready.sort(key=lambda x: node_by_id[x].first_order)
+                heapq.heappush(heap, (nodes[dst].first_order, dst))
 
-    if len(ordered_ids) != len(nodes):
+    if len(ordered) != len(nodes):
         # Fall back to the stable original order if dependency graph has cycles.
         return sorted(nodes, key=lambda n: n.first_order)
 
-    return [node_by_id[nid] for nid in ordered_ids]
+    return ordered
+
 
+class _PathInfo(NamedTuple):
+    """
+    Path-derived facts shared by every hunk group in a file.
+    """
+
+    is_test: bool
+    module_key: Optional[str]
+    # Language, test, path and module tags; only the symbol tag varies
+    # per group.
+    tags: FrozenSet[str]
 
-def _base_tags_for_path(path: str) -> Set[str]:
-    tags: Set[str] = set()
+
+@lru_cache(maxsize=8192)
+def _path_info(path: str) -> _PathInfo:
+    is_test = _TEST_PATH_RE.search(path) is not None
+    module_key = _module_key(path)
+
+    tags = {f"path:{path}"}
     language = detect_language(path)
     if language:
         tags.add(language)
-    if _is_test_path(path):
+    if is_test:
         tags.add("test")
-    return tags
-
+    if module_key:
+        tags.add(f"module:{module_key}")
 
-def _is_test_path(path: str) -> bool:
-    lower = path.lower()
-    name = Path(path).name.lower()
-    if "/tests/" in f"/{lower}/":
-        return True
-    if name.startswith("test_") or name.endswith("_test.py") or name.endswith(".spec.ts"):
-        return True
-    return "test" in lower
+    return _PathInfo(is_test=is_test, module_key=module_key, tags=frozenset(tags))
 
 
-def _normalize_symbol(symbol: Optional[str]) -> str:
-    if not symbol:
-        return ""
+@lru_cache(maxsize=4096)
+def _normalize_symbol(symbol: str) -> str:
     return " ".join(symbol.strip().split()).lower()
 
 
@@ -8,11 +8,13 @@ real git commits or a dry-run description.
 from __future__ import annotations
 
 import logging
+from typing import Optional
 
 from .config import Config
-from .diff_parser import render_partial_diff
+from .diff_parser import iter_partial_diff
 from .domain import Plan
-from .errors import GitError
+from .errors import GitError, UnsupportedOperationError
+from .fast_import import build_commit_chain
 from .git_adapter import (
     apply_patch,
     create_branch,
@@ -32,20 +34,23 @@ def apply_plan(plan: Plan, config: Config) -> None:
     Apply the given plan according to the configuration.
 
     In dry-run mode this prints a summary only. In non-dry-run mode it
-    creates a new branch starting from the diff's base commit and
-    applies each suggested commit as a partial patch, ensuring that the
-    final tree matches the original target commit.
+    creates a new branch starting from the diff's base commit and writes
+    the suggested commits onto it, ensuring that the final tree matches
+    the original target commit. Commits are written with a single
+    fast-import run when their content can be reconstructed from the
+    diff, and applied one partial patch at a time otherwise.
     """
 
     if config.dry_run:
         LOG.info("Dry run: would apply %d commits", len(plan.suggested_commits))
-        for commit in plan.suggested_commits:
-            LOG.info(
-                "  Commit %s: %s (%d hunks)",
-                commit.id,
-                commit.title,
-                len(commit.hunk_ids),
-            )
+        if LOG.isEnabledFor(logging.INFO):
+            for commit in plan.suggested_commits:
+                LOG.info(
+                    "  Commit %s: %s (%d hunks)",
+                    commit.id,
+                    commit.title,
+                    len(commit.hunk_ids),
+                )
         return
 
     base = plan.diff.base_commit
@@ -57,8 +62,9 @@ def apply_plan(plan: Plan, config: Config) -> None:
             "this mode currently supports only splitting real commits"
         )
 
-    ensure_repo_clean()
-    original_ref = get_current_ref()
+    cwd = config.cwd
+    ensure_repo_clean(cwd=cwd)
+    original_ref = get_current_ref(cwd=cwd)
 
     branch_name = f"banana-split/split-{target[:7]}"
     LOG.info(
@@ -68,35 +74,27 @@ def apply_plan(plan: Plan, config: Config) -> None:
     branch_created = False
     branch_checked_out = False
     try:
-        # Create and check out the work branch. If the branch already
-        # exists, this will raise and surface an error to the user so they
-        # can clean it up or choose a different target.
-        create_branch(branch_name, base)
+        # Create the work branch. If the branch already exists, this will
+        # raise and surface an error to the user so they can clean it up
+        # or choose a different target.
+        create_branch(branch_name, base, cwd=cwd)
         branch_created = True
-        checkout(branch_name)
-        branch_checked_out = True
-
-        for suggested in plan.suggested_commits:
-            if not suggested.hunk_ids:
-                continue
-
-            LOG.info("Applying suggested commit %s: %s", suggested.id, suggested.title)
-            patch = render_partial_diff(plan.diff, suggested.hunk_ids)
-            if not patch.strip():
-                LOG.warning("Generated empty patch for commit %s; skipping", suggested.id)
-                continue
-
-            # Apply patch to the index only; the working tree will be
-            # synchronized with HEAD when the operation completes.
-            apply_patch(patch, index_only=True)
 
-            message = suggested.title
-            if suggested.body:
-                message = f"{suggested.title}\n\n{suggested.body}"
-            create_commit(message)
+        try:
+            # Write every commit with a single fast-import run, then check
+            # out the finished branch.
+            build_commit_chain(plan, branch_name, cwd=cwd)
+        except UnsupportedOperationError as exc:
+            LOG.info("Falling back to applying commits as patches: %s", exc)
+            checkout(branch_name, cwd=cwd)
+            branch_checked_out = True
+            _apply_commits_as_patches(plan, cwd=cwd)
+        else:
+            checkout(branch_name, cwd=cwd)
+            branch_checked_out = True
 
         # Verify that the final tree matches the original target commit.
-        if not trees_equal(target, "HEAD"):
+        if not trees_equal(target, "HEAD", cwd=cwd):
             raise GitError(
                 "final tree does not match original commit after applying plan; "
                 "this indicates a bug in patch generation"
@@ -107,6 +105,7 @@ def apply_plan(plan: Plan, config: Config) -> None:
             branch_name=branch_name,
             branch_created=branch_created,
             branch_checked_out=branch_checked_out,
+            cwd=cwd,
         )
         raise
 
@@ -117,12 +116,47 @@ def apply_plan(plan: Plan, config: Config) -> None:
     )
 
 
+def _apply_commits_as_patches(plan: Plan, cwd: Optional[str]) -> None:
+    """
+    Create the plan's commits one by one on the checked-out work branch.
+
+    Each commit's hunks are streamed into the index with `git apply`,
+    including the commit that completes the diff, so that apply_plan's
+    final tree check covers every rendered patch.
+    """
+
+    hunk_index = plan.get_hunk_index()
+
+    for suggested in plan.suggested_commits:
+        if not suggested.hunk_ids:
+            continue
+
+        LOG.info("Applying suggested commit %s: %s", suggested.id, suggested.title)
+        if not any(hid in hunk_index for hid in suggested.hunk_ids):
+            LOG.warning("Generated empty patch for commit %s; skipping", suggested.id)
+            continue
+
+        # Stream the patch into the index only; the working tree will be
+        # synchronized with HEAD when the operation completes.
+        apply_patch(
+            iter_partial_diff(plan.diff, suggested.hunk_ids, hunk_index=hunk_index),
+            index_only=True,
+            cwd=cwd,
+        )
+
+        message = suggested.title
+        if suggested.body:
+            message = f"{suggested.title}\n\n{suggested.body}"
+        create_commit(message, cwd=cwd)
+
+
 def _rollback_partial_apply(
     *,
     original_ref: str,
     branch_name: str,
     branch_created: bool,
     branch_checked_out: bool,
+    cwd: Optional[str] = None,
 ) -> None:
     """
     Best-effort rollback when apply_plan fails mid-flight.
@@ -130,7 +164,7 @@ def _rollback_partial_apply(
 
     if branch_checked_out:
         try:
-            checkout(original_ref)
+            checkout(original_ref, cwd=cwd)
         except GitError as exc:
             LOG.error(
                 "Failed to return to original ref %s during rollback: %s",
@@ -140,6 +174,6 @@ def _rollback_partial_apply(
 
     if branch_created:
         try:
-            delete_branch(branch_name, force=True)
+            delete_branch(branch_name, force=True, cwd=cwd)
         except GitError as exc:
             LOG.error("Failed to delete temporary branch %s: %s", branch_name, exc)
@@ -12,13 +12,7 @@ import sys
 from typing import List, Optional
 
 from .config import Config
-from .eval.harness import (
-    print_evaluation_summary,
-    run_evaluation,
-    write_evaluation_report,
-)
 from .logging_utils import configure_logging
-from .planner import run_split
 
 
 def build_arg_parser() -> argparse.ArgumentParser:
@@ -77,6 +71,12 @@ def build_arg_parser() -> argparse.ArgumentParser:
         "--eval-output",
         help="Write evaluation report JSON to this path.",
     )
+    parser.add_argument(
+        "--eval-jobs",
+        type=int,
+        default=1,
+        help="Number of evaluation cases to run in parallel (default: 1).",
+    )
     parser.add_argument(
         "--eval-fail-on-case-failure",
         action="store_true",
@@ -106,11 +106,21 @@ def main(argv: Optional[List[str]] = None) -> int:
                 parser.error("--eval-corpus cannot be combined with a target argument")
             if args.staged:
                 parser.error("--eval-corpus cannot be combined with --staged")
+            if args.eval_jobs < 1:
+                parser.error("--eval-jobs must be a positive integer")
+
+            # Imported lazily so regular runs do not load the eval subsystem.
+            from .eval.harness import (
+                print_evaluation_summary,
+                run_evaluation,
+                write_evaluation_report,
+            )
 
             report = run_evaluation(
                 corpus_path=args.eval_corpus,
                 use_ai=config.use_ai,
                 verbosity=config.verbosity,
+                jobs=args.eval_jobs,
             )
             print_evaluation_summary(report)
 
@@ -124,6 +134,9 @@ def main(argv: Optional[List[str]] = None) -> int:
                 return 2
             return 0
 
+        # Imported lazily so --help and eval runs skip the planner stack.
+        from .planner import run_split
+
         run_split(config)
     except KeyboardInterrupt:
         # Graceful shutdown on Ctrl+C
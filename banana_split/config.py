@@ -25,4 +25,7 @@ class Config:
     dry_run: bool = False
     use_ai: bool = False
     verbosity: int = 0
+    # Repository directory git commands run in; None means the current
+    # working directory.
+    cwd: Optional[str] = None
 
@@ -13,73 +13,180 @@ contents without ever altering the underlying source code.
 
 from __future__ import annotations
 
-import re
-from typing import Iterable, List, Optional, Sequence, Set, Tuple
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, Union
 
-from .domain import Diff, DiffHunk, DiffLine, FileDiff
+from .domain import Diff, DiffHunk, DiffLine, FileDiff, HunkRef
 from .analysis.language_intel import detect_language, extract_symbol_name_from_hunk_header
 
 
-_HUNK_HEADER_RE = re.compile(
-    r"^@@ -(?P<old_start>\d+)(?:,(?P<old_count>\d+))?"
-    r" \+(?P<new_start>\d+)(?:,(?P<new_count>\d+))?"
-    r" @@"
+# Every metadata line _parse_single_file_diff reacts to starts with one of
+# these; anything else between the "diff --git" header and the hunks is
+# skipped without further inspection.
+_META_PREFIXES = (
+    "--- ",
+    "diff --git ",
+    "new file mode ",
+    "deleted file mode ",
+    "rename from ",
+    "rename to ",
+    "Binary files ",
+    "GIT binary patch",
 )
+# Maps the first character of a hunk body line to its DiffLine.line_type.
+_LINE_TYPES = {"+": "+", "-": "-", " ": " "}
 
+_LEN_RENAME_FROM = len("rename from ")
+_LEN_RENAME_TO = len("rename to ")
 
-def parse_unified_diff(raw_diff: str) -> Diff:
+
+class _LineCursor:
+    """
+    Forward-only cursor over the lines of a raw diff string.
+
+    Lines are sliced out of the original string on demand, so parsing
+    never materializes a list of every line in the diff. Lines are
+    separated by "\n" only; any other characters (including "\r") are
+    part of the line content.
+    """
+
+    __slots__ = ("raw", "pos", "end")
+
+    def __init__(self, raw: str) -> None:
+        self.raw = raw
+        self.pos = 0
+        self.end = len(raw)
+
+    def at_end(self) -> bool:
+        return self.pos >= self.end
+
+    def startswith(self, prefix: Union[str, Tuple[str, ...]]) -> bool:
+        """Return True if the current line starts with prefix (or any of them)."""
+        return self.raw.startswith(prefix, self.pos)
+
+    def peek(self) -> str:
+        """Return the current line without consuming it."""
+        nl = self.raw.find("\n", self.pos)
+        return self.raw[self.pos : self.end if nl < 0 else nl]
+
+    def advance(self) -> None:
+        """Skip the current line."""
+        nl = self.raw.find("\n", self.pos)
+        self.pos = self.end if nl < 0 else nl + 1
+
+    def read_hunk_body(self) -> List[str]:
+        """
+        Return the lines up to the next hunk or file header and move past them.
+        """
+
+        span = self.skip_hunk_body()
+        if span is None:
+            return []
+        return self.raw[span[0] : span[1]].split("\n")
+
+    def skip_hunk_body(self) -> Optional[Tuple[int, int]]:
+        """
+        Move past the lines up to the next hunk or file header.
+
+        Returns the (start, stop) slice of the body without its final
+        newline, or None if there is no body. The end of the body is
+        located with two bounded str.find() calls instead of inspecting
+        the diff one line at a time.
+        """
+
+        raw = self.raw
+        pos = self.pos
+        if pos >= self.end or raw.startswith(("@@", "diff --git "), pos):
+            return None
+
+        stop = raw.find("\n@@", pos)
+        if stop < 0:
+            stop = self.end
+        next_file = raw.find("\ndiff --git ", pos, stop)
+        if next_file >= 0:
+            stop = next_file
+
+        if stop >= self.end:
+            self.pos = self.end
+            if raw.endswith("\n"):
+                return pos, self.end - 1
+            return pos, self.end
+        self.pos = stop + 1
+        return pos, stop
+
+    def skip_to_next_file(self) -> None:
+        """
+        Move to the next line starting with "diff --git " (or to the end).
+
+        Stays put if the current line already starts a file section.
+        """
+
+        if self.raw.startswith("diff --git ", self.pos):
+            return
+        nxt = self.raw.find("\ndiff --git ", self.pos)
+        self.pos = self.end if nxt < 0 else nxt + 1
+
+    def readline(self) -> str:
+        """Return the current line and move past it."""
+        nl = self.raw.find("\n", self.pos)
+        if nl < 0:
+            line = self.raw[self.pos : self.end]
+            self.pos = self.end
+        else:
+            line = self.raw[self.pos : nl]
+            self.pos = nl + 1
+        return line
+
+
+def parse_unified_diff(raw_diff: str, metadata_only: bool = False) -> Diff:
     """
     Parse a unified diff into a Diff object.
 
     The returned Diff does not currently populate base_commit or
     target_commit; these can be supplied by the caller based on the git
     command used to obtain the diff.
+
+    With metadata_only, files and hunks (ids, headers, meta) are parsed
+    as usual but hunk bodies are skipped, leaving every DiffHunk.lines
+    empty. Such a diff is enough for planning but cannot be rendered
+    back into patches.
     """
 
-    lines = raw_diff.splitlines()
     files: List[FileDiff] = []
-
-    if not lines:
+    if not raw_diff:
+        # Nothing staged / empty commit: common enough to skip the cursor.
         return Diff(base_commit=None, target_commit=None, files=files)
 
-    i = 0
-    # Skip any preamble (e.g. commit headers) until the first file diff.
-    while i < len(lines) and not lines[i].startswith("diff --git "):
-        i += 1
+    cursor = _LineCursor(raw_diff)
 
-    while i < len(lines):
-        if not lines[i].startswith("diff --git "):
-            i += 1
-            continue
+    # Skip any preamble (e.g. commit headers) until the first file diff,
+    # and any stray lines between file diffs.
+    while True:
+        cursor.skip_to_next_file()
+        if cursor.at_end():
+            break
 
-        file_diff, i = _parse_single_file_diff(lines, i)
+        file_diff = _parse_single_file_diff(cursor, metadata_only)
         if file_diff is not None:
             files.append(file_diff)
 
     return Diff(base_commit=None, target_commit=None, files=files)
 
 
-def _parse_single_file_diff(
-    lines: Sequence[str],
-    start_index: int,
-) -> Tuple[Optional[FileDiff], int]:
+def _parse_single_file_diff(cursor: _LineCursor, metadata_only: bool = False) -> Optional[FileDiff]:
     """
-    Parse a single `diff --git` section starting at start_index.
+    Parse a single `diff --git` section starting at the cursor.
 
-    Returns a tuple of (FileDiff | None, next_index).
+    Leaves the cursor at the start of the next section (or at the end).
     """
 
-    i = start_index
-    header_line = lines[i]
-    i += 1
+    header_line = cursor.readline()
 
     # Example: "diff --git a/path b/path"
     parts = header_line.split()
     if len(parts) < 4:
         # Malformed; skip to next diff.
-        while i < len(lines) and not lines[i].startswith("diff --git "):
-            i += 1
-        return None, i
+        cursor.skip_to_next_file()
+        return None
 
     path_old = parts[-2]
     path_new = parts[-1]
@@ -95,21 +202,28 @@ def _parse_single_file_diff(
     explicit_rename_to: Optional[str] = None
 
     # Consume metadata lines until we hit file headers ("---"/"+++") or
-    # another diff section.
-    while i < len(lines):
-        line = lines[i]
+    # another diff section. Lines that cannot be metadata (index lines,
+    # mode changes, similarity scores, ...) are rejected with a single
+    # startswith() call.
+    while not cursor.at_end():
+        if not cursor.startswith(_META_PREFIXES):
+            cursor.advance()
+            continue
+
+        line = cursor.peek()
+
+        if line.startswith("--- "):
+            # Start of textual diff for this file.
+            break
 
         if line.startswith("diff --git "):
             # No content for this file; return what we have.
-            return (
-                FileDiff(
-                    path_old=path_old,
-                    path_new=path_new,
-                    change_type=change_type,  # type: ignore[arg-type]
-                    is_binary=is_binary,
-                    hunks=[],
-                ),
-                i,
+            return FileDiff(
+                path_old=path_old,
+                path_new=path_new,
+                change_type=change_type,  # type: ignore[arg-type]
+                is_binary=is_binary,
+                hunks=[],
             )
 
         if line.startswith("new file mode "):
@@ -117,20 +231,18 @@ def _parse_single_file_diff(
         elif line.startswith("deleted file mode "):
             change_type = "delete"
         elif line.startswith("rename from "):
-            explicit_rename_from = line[len("rename from ") :].strip()
+            explicit_rename_from = line[_LEN_RENAME_FROM:].strip()
             change_type = "rename"
         elif line.startswith("rename to "):
-            explicit_rename_to = line[len("rename to ") :].strip()
+            explicit_rename_to = line[_LEN_RENAME_TO:].strip()
             change_type = "rename"
-        elif line.startswith("Binary files ") and " differ" in line:
-            is_binary = True
-        elif line.startswith("GIT binary patch"):
+        elif line.startswith("Binary files "):
+            if " differ" in line:
+                is_binary = True
+        else:  # "GIT binary patch"
             is_binary = True
-        elif line.startswith("--- "):
-            # Start of textual diff for this file.
-            break
 
-        i += 1
+        cursor.advance()
 
     # Finalize paths based on rename metadata if present.
     if explicit_rename_from is not None:
@@ -141,29 +253,23 @@ def _parse_single_file_diff(
     # Binary files may or may not have textual hunks. For now, we treat
     # them as opaque and skip any patch body.
     if is_binary:
-        while i < len(lines) and not lines[i].startswith("diff --git "):
-            i += 1
-        return (
-            FileDiff(
-                path_old=path_old,
-                path_new=path_new,
-                change_type=change_type,  # type: ignore[arg-type]
-                is_binary=True,
-                hunks=[],
-            ),
-            i,
+        cursor.skip_to_next_file()
+        return FileDiff(
+            path_old=path_old,
+            path_new=path_new,
+            change_type=change_type,  # type: ignore[arg-type]
+            is_binary=True,
+            hunks=[],
         )
 
     # Parse file header lines: --- and +++
     old_path_line: Optional[str] = None
     new_path_line: Optional[str] = None
 
-    if i < len(lines) and lines[i].startswith("--- "):
-        old_path_line = lines[i][4:].strip()
-        i += 1
-    if i < len(lines) and lines[i].startswith("+++ "):
-        new_path_line = lines[i][4:].strip()
-        i += 1
+    if cursor.startswith("--- "):
+        old_path_line = cursor.readline()[4:].strip()
+    if cursor.startswith("+++ "):
+        new_path_line = cursor.readline()[4:].strip()
 
     # Use /dev/null markers to refine change_type and paths.
     if old_path_line == "/dev/null":
@@ -189,98 +295,89 @@ def _parse_single_file_diff(
     language = detect_language(path_new or path_old or "") if (path_new or path_old) else None
 
     # Parse hunks until the next diff header or EOF.
-    while i < len(lines) and not lines[i].startswith("diff --git "):
-        if lines[i].startswith("@@"):
-            hunk, i = _parse_hunk(
-                lines=lines,
-                start_index=i,
-                file_path=path_new or path_old or "",
-                hunk_index=hunk_index,
-                language=language,
+    while not cursor.at_end() and not cursor.startswith("diff --git "):
+        if cursor.startswith("@@"):
+            hunks.append(
+                _parse_hunk(
+                    cursor,
+                    file_path=path_new or path_old or "",
+                    hunk_index=hunk_index,
+                    language=language,
+                    metadata_only=metadata_only,
+                )
             )
-            hunks.append(hunk)
             hunk_index += 1
         else:
-            i += 1
-
-    return (
-        FileDiff(
-            path_old=path_old,
-            path_new=path_new,
-            change_type=change_type,  # type: ignore[arg-type]
-            is_binary=is_binary,
-            hunks=hunks,
-        ),
-        i,
+            cursor.advance()
+
+    return FileDiff(
+        path_old=path_old,
+        path_new=path_new,
+        change_type=change_type,  # type: ignore[arg-type]
+        is_binary=is_binary,
+        hunks=hunks,
     )
 
 
 def _parse_hunk(
-    lines: Sequence[str],
-    start_index: int,
+    cursor: _LineCursor,
     file_path: str,
     hunk_index: int,
     language: Optional[str],
-) -> Tuple[DiffHunk, int]:
+    metadata_only: bool = False,
+) -> DiffHunk:
     """
-    Parse a single hunk starting at `start_index`.
+    Parse a single hunk starting at the cursor.
     """
 
-    header = lines[start_index]
-    i = start_index + 1
+    header = cursor.readline()
+
+    diff_lines: List[DiffLine] = []
+    if metadata_only:
+        cursor.skip_hunk_body()
+        return _make_hunk(header, diff_lines, file_path, hunk_index, language)
 
     old_start, new_start = _parse_hunk_header_ranges(header)
     original_lineno: Optional[int] = old_start
     new_lineno: Optional[int] = new_start
 
-    diff_lines: List[DiffLine] = []
+    append = diff_lines.append
 
-    while i < len(lines):
-        line = lines[i]
-
-        if line.startswith("diff --git ") or line.startswith("@@"):
-            break
-
-        if line.startswith("\\ No newline at end of file"):
+    for line in cursor.read_hunk_body():
+        line_type = _LINE_TYPES.get(line[:1])
+        if line_type is not None:
+            content = line[1:]
+        elif line.startswith("\\ No newline at end of file"):
             # This line modifies the semantics of the previous line but
             # does not itself represent a source line, so we ignore it
             # in the structural representation.
-            i += 1
             continue
-
-        if not line:
-            # Empty line inside a hunk is treated as context.
-            line_type = " "
-            content = ""
         else:
-            first_char = line[0]
-            if first_char in ("+", "-", " "):
-                line_type = first_char
-                content = line[1:]
-            else:
-                # Unexpected leading character; treat as context to avoid
-                # corrupting the patch.
-                line_type = " "
-                content = line
-
-        diff_lines.append(
-            DiffLine(
-                line_type=line_type,  # type: ignore[arg-type]
-                content=content,
-                original_lineno=original_lineno,
-                new_lineno=new_lineno,
-            )
-        )
+            # Empty lines inside a hunk are context; any other unexpected
+            # leading character is treated as context as well to avoid
+            # corrupting the patch.
+            line_type = " "
+            content = line
 
-        if line_type in (" ", "-") and original_lineno is not None:
+        # Positional arguments: this runs once per diff line and keyword
+        # binding is a measurable share of the cost.
+        append(DiffLine(line_type, content, original_lineno, new_lineno))  # type: ignore[arg-type]
+
+        if line_type != "+" and original_lineno is not None:
             original_lineno += 1
-        if line_type in (" ", "+") and new_lineno is not None:
+        if line_type != "-" and new_lineno is not None:
             new_lineno += 1
 
-        i += 1
+    return _make_hunk(header, diff_lines, file_path, hunk_index, language)
 
-    hunk_id = f"{file_path}::h{hunk_index}"
 
+def _make_hunk(
+    header: str,
+    lines: List[DiffLine],
+    file_path: str,
+    hunk_index: int,
+    language: Optional[str],
+) -> DiffHunk:
     meta: dict[str, object] = {}
     if language:
         meta["language"] = language
@@ -290,29 +387,55 @@ def _parse_hunk(
         meta["symbol"] = symbol_name
 
     return DiffHunk(
-        id=hunk_id,
+        id=f"{file_path}::h{hunk_index}",
         file_path=file_path,
         header=header,
-        lines=diff_lines,
+        lines=lines,
         meta=meta,
-    ), i
+    )
 
 
 def _parse_hunk_header_ranges(header: str) -> Tuple[Optional[int], Optional[int]]:
     """
     Extract the old and new starting line numbers from a hunk header.
+
+    The header has the fixed shape "@@ -<start>[,<count>] +<start>[,<count>] @@",
+    so it is sliced by hand rather than matched with a regex.
     """
 
-    match = _HUNK_HEADER_RE.match(header)
-    if not match:
+    if not header.startswith("@@ -"):
         return None, None
 
-    old_start = int(match.group("old_start"))
-    new_start = int(match.group("new_start"))
+    old_end = header.find(" +", 4)
+    if old_end < 0:
+        return None, None
+    new_end = header.find(" @@", old_end + 2)
+    if new_end < 0:
+        return None, None
+
+    old_start = _parse_range_start(header[4:old_end])
+    new_start = _parse_range_start(header[old_end + 2 : new_end])
+    if old_start is None or new_start is None:
+        return None, None
     return old_start, new_start
 
 
-def render_partial_diff(diff: Diff, hunk_ids: Iterable[str]) -> str:
+def _parse_range_start(spec: str) -> Optional[int]:
+    """
+    Return the start line of a "<start>[,<count>]" range, or None if malformed.
+    """
+
+    start, sep, count = spec.partition(",")
+    if not start.isdecimal() or (sep and not count.isdecimal()):
+        return None
+    return int(start)
+
+
+def render_partial_diff(
+    diff: Diff,
+    hunk_ids: Iterable[str],
+    hunk_index: Optional[Dict[str, HunkRef]] = None,
+) -> str:
     """
     Render a new unified diff containing only the hunks with the given ids.
 
@@ -323,44 +446,84 @@ def render_partial_diff(diff: Diff, hunk_ids: Iterable[str]) -> str:
     for the initial implementation.
     """
 
-    include_ids: Set[str] = set(hunk_ids)
-    if not include_ids:
-        return ""
+    return "".join(iter_partial_diff(diff, hunk_ids, hunk_index=hunk_index))
+
+
+def iter_partial_diff(
+    diff: Diff,
+    hunk_ids: Iterable[str],
+    hunk_index: Optional[Dict[str, HunkRef]] = None,
+) -> Iterator[str]:
+    """
+    Lazily render the partial diff produced by render_partial_diff.
+
+    Output is yielded in chunks (one file header or one hunk at a time)
+    so callers can stream large patches without holding them in memory.
+    Every chunk ends with a newline.
+
+    When a hunk_index for the diff is supplied (see Plan.get_hunk_index),
+    only the selected hunks are visited instead of every hunk in the diff.
+    """
 
-    output: List[str] = []
+    include_ids: FrozenSet[str] = frozenset(hunk_ids)
+    remaining = len(include_ids)
+    if not remaining:
+        return
+
+    if hunk_index is not None:
+        refs = sorted(
+            (hunk_index[hid] for hid in include_ids if hid in hunk_index),
+            key=lambda ref: ref.order,
+        )
+        current_file: Optional[FileDiff] = None
+        for ref in refs:
+            if ref.file is not current_file:
+                current_file = ref.file
+                yield _render_file_header(current_file)
+            yield _render_hunk(ref.hunk)
+        return
 
     for file in diff.files:
+        if remaining <= 0:
+            # Every requested hunk has been rendered; the rest of the
+            # diff cannot contribute anything.
+            break
+
         selected_hunks = [h for h in file.hunks if h.id in include_ids]
         if not selected_hunks:
             continue
+        remaining -= len(selected_hunks)
 
-        path_old = file.path_old or file.path_new or "unknown"
-        path_new = file.path_new or file.path_old or "unknown"
+        yield _render_file_header(file)
+        for hunk in selected_hunks:
+            yield _render_hunk(hunk)
 
-        output.append(f"diff --git a/{path_old} b/{path_new}")
 
-        # Minimal file headers; mode and index lines are omitted because
-        # they are not required for `git apply`.
-        if file.change_type == "add":
-            old_label = "/dev/null"
-            new_label = f"b/{path_new}"
-        elif file.change_type == "delete":
-            old_label = f"a/{path_old}"
-            new_label = "/dev/null"
-        else:
-            old_label = f"a/{path_old}"
-            new_label = f"b/{path_new}"
+def _render_file_header(file: FileDiff) -> str:
+    path_old = file.path_old or file.path_new or "unknown"
+    path_new = file.path_new or file.path_old or "unknown"
 
-        output.append(f"--- {old_label}")
-        output.append(f"+++ {new_label}")
+    # Minimal file headers; mode and index lines are omitted because
+    # they are not required for `git apply`.
+    if file.change_type == "add":
+        old_label = "/dev/null"
+        new_label = f"b/{path_new}"
+    elif file.change_type == "delete":
+        old_label = f"a/{path_old}"
+        new_label = "/dev/null"
+    else:
+        old_label = f"a/{path_old}"
+        new_label = f"b/{path_new}"
 
-        for hunk in selected_hunks:
-            output.append(hunk.header)
-            for line in hunk.lines:
-                output.append(f"{line.line_type}{line.content}")
+    return (
+        f"diff --git a/{path_old} b/{path_new}\n"
+        f"--- {old_label}\n"
+        f"+++ {new_label}\n"
+    )
 
-    if not output:
-        return ""
 
-    # Ensure diff ends with a newline, as expected by most tools.
+def _render_hunk(hunk: DiffHunk) -> str:
+    output = [hunk.header]
+    for line in hunk.lines:
+        output.append(f"{line.line_type}{line.content}")
     return "\n".join(output) + "\n"
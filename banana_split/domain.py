@@ -8,11 +8,17 @@ they can be reused by different parts of the system.
 
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass, field
-from typing import Any, Literal, Optional, Set, List
+from typing import AbstractSet, Any, Dict, Literal, NamedTuple, Optional, List, Sequence
 
+# Domain models drop the per-instance __dict__ where the interpreter
+# supports it (dataclass(slots=True) needs Python 3.10+); diff models in
+# particular are instantiated once per parsed line/hunk/file.
+_SLOTS: dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_SLOTS)
 class DiffLine:
     """
     A single line within a diff hunk.
@@ -28,7 +34,7 @@ class DiffLine:
     new_lineno: Optional[int] = None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class DiffHunk:
     """
     A contiguous block of changes in a single file.
@@ -41,7 +47,7 @@ class DiffHunk:
     meta: dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class FileDiff:
     """
     All hunks associated with a single file in a diff.
@@ -54,7 +60,7 @@ class FileDiff:
     hunks: List[DiffHunk] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Diff:
     """
     A parsed representation of a git diff between two commits or trees.
@@ -65,7 +71,32 @@ class Diff:
     files: List[FileDiff] = field(default_factory=list)
 
 
-@dataclass
+class HunkRef(NamedTuple):
+    """
+    Where a hunk lives in a Diff.
+
+    order is the hunk's position across the whole diff (file by file,
+    hunk by hunk), so sorting refs by it restores diff order.
+    """
+
+    order: int
+    file: FileDiff
+    hunk: DiffHunk
+
+
+def index_hunks(diff: Diff) -> Dict[str, HunkRef]:
+    """
+    Map every hunk id in the diff to its HunkRef.
+    """
+
+    index: Dict[str, HunkRef] = {}
+    for file in diff.files:
+        for hunk in file.hunks:
+            index[hunk.id] = HunkRef(len(index), file, hunk)
+    return index
+
+
+@dataclass(**_SLOTS)
 class AtomicChange:
     """
     A small, coherent unit of change made up of one or more hunks.
@@ -73,11 +104,11 @@ class AtomicChange:
 
     id: str
     hunk_ids: List[str]
-    tags: Set[str] = field(default_factory=set)
+    tags: AbstractSet[str] = field(default_factory=frozenset)
     summary: Optional[str] = None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class SuggestedCommit:
     """
     A proposed commit, consisting of one or more atomic changes.
@@ -86,12 +117,14 @@ class SuggestedCommit:
     id: str
     title: str
     body: Optional[str]
-    atomic_change_ids: List[str]
-    hunk_ids: List[str]
+    # Lists while the plan is being built; frozen to tuples once the
+    # plan has been validated.
+    atomic_change_ids: Sequence[str]
+    hunk_ids: Sequence[str]
     estimated_risk: Optional[Literal["low", "medium", "high"]] = None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Plan:
     """
     The full plan to split a diff into multiple commits.
@@ -101,4 +134,18 @@ class Plan:
     atomic_changes: List[AtomicChange] = field(default_factory=list)
     suggested_commits: List[SuggestedCommit] = field(default_factory=list)
     invariants_checked: bool = False
+    # Hunk locations keyed by id; filled in by plan validation or on first
+    # use of get_hunk_index(). Derived from `diff`, so it is not part of
+    # equality.
+    hunk_index: Optional[Dict[str, HunkRef]] = field(default=None, repr=False, compare=False)
+
+    def get_hunk_index(self) -> Dict[str, HunkRef]:
+        """
+        Return the location of every hunk in the plan's diff, keyed by id.
+
+        The index is built once and cached on the plan.
+        """
 
+        if self.hunk_index is None:
+            self.hunk_index = index_hunks(self.diff)
+        return self.hunk_index
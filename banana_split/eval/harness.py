@@ -11,15 +11,16 @@ import json
 import os
 import subprocess
 import tempfile
-from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from itertools import repeat
 from pathlib import Path
-from typing import Any, Dict, Iterator, List, Optional, TextIO
+from typing import Any, Dict, List, Optional, Set, TextIO
 
 from ..apply import apply_plan
 from ..config import Config
-from ..domain import DiffHunk, Plan
+from ..domain import Plan
 from ..planner import build_plan
 
 
@@ -97,13 +98,25 @@ def run_evaluation(
     corpus_path: str,
     use_ai: bool,
     verbosity: int,
+    jobs: int = 1,
 ) -> Dict[str, Any]:
     """
     Execute all corpus cases and return a structured report.
+
+    Cases are independent (each works in its own clone), so with jobs > 1
+    they run concurrently on a thread pool; the work is dominated by git
+    subprocesses. Case reports keep corpus order either way.
     """
 
     cases = load_eval_corpus(corpus_path)
-    case_reports: List[Dict[str, Any]] = []
+
+    if jobs > 1 and len(cases) > 1:
+        with ThreadPoolExecutor(max_workers=min(jobs, len(cases))) as pool:
+            case_reports = list(
+                pool.map(_run_case, cases, repeat(use_ai), repeat(verbosity))
+            )
+    else:
+        case_reports = [_run_case(case, use_ai, verbosity) for case in cases]
 
     plan_build_failures = 0
     apply_failures = 0
@@ -117,57 +130,25 @@ def run_evaluation(
     total_semantic_cohesion_score = 0.0
     planned_case_count = 0
 
-    for case in cases:
-        case_report: Dict[str, Any] = {
-            "name": case.name,
-            "repo_url": case.repo_url,
-            "target": case.target,
-            "branch": case.branch,
-        }
-
-        try:
-            with tempfile.TemporaryDirectory(prefix="banana-split-eval-") as tmpdir:
-                repo_dir = Path(tmpdir) / "repo"
-                _clone_repo(case, repo_dir)
-                _configure_git_identity(repo_dir)
-
-                with _pushd(repo_dir):
-                    config = Config(
-                        target=case.target,
-                        use_staged=False,
-                        dry_run=False,
-                        use_ai=use_ai,
-                        verbosity=verbosity,
-                    )
-
-                    plan = build_plan(config)
-                    metrics = _plan_metrics(plan)
-                    case_report["plan_metrics"] = metrics
-                    planned_case_count += 1
-                    total_suggested_commits += metrics["suggested_commit_count"]
-                    total_hunks_in_suggested_commits += metrics["total_hunks_in_suggested_commits"]
-                    total_files_in_suggested_commits += metrics["total_files_in_suggested_commits"]
-                    single_file_commit_count += metrics["single_file_commit_count"]
-                    single_symbol_commit_count += metrics["single_symbol_commit_count"]
-                    total_semantic_cohesion_score += metrics["semantic_cohesion_score_sum"]
-
-                    apply_plan(plan, config)
-
-                case_report["status"] = "success"
-                case_report["tree_equal"] = True
-                successful_cases += 1
-        except Exception as exc:  # noqa: BLE001
-            error = str(exc)
-            if "plan_metrics" in case_report:
-                case_report["status"] = "apply_failed"
-                apply_failures += 1
-            else:
-                case_report["status"] = "plan_build_failed"
-                plan_build_failures += 1
-            case_report["tree_equal"] = False
-            case_report["error"] = error
-
-        case_reports.append(case_report)
+    for case_report in case_reports:
+        status = case_report["status"]
+        if status == "success":
+            successful_cases += 1
+        elif status == "apply_failed":
+            apply_failures += 1
+        else:
+            plan_build_failures += 1
+
+        metrics = case_report.get("plan_metrics")
+        if metrics is None:
+            continue
+        planned_case_count += 1
+        total_suggested_commits += metrics["suggested_commit_count"]
+        total_hunks_in_suggested_commits += metrics["total_hunks_in_suggested_commits"]
+        total_files_in_suggested_commits += metrics["total_files_in_suggested_commits"]
+        single_file_commit_count += metrics["single_file_commit_count"]
+        single_symbol_commit_count += metrics["single_symbol_commit_count"]
+        total_semantic_cohesion_score += metrics["semantic_cohesion_score_sum"]
 
     apply_attempted_cases = len(cases) - plan_build_failures
     summary = {
@@ -216,6 +197,51 @@ def run_evaluation(
     }
 
 
+def _run_case(case: EvalCase, use_ai: bool, verbosity: int) -> Dict[str, Any]:
+    """
+    Clone, plan, and apply a single case, returning its report entry.
+    """
+
+    case_report: Dict[str, Any] = {
+        "name": case.name,
+        "repo_url": case.repo_url,
+        "target": case.target,
+        "branch": case.branch,
+    }
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="banana-split-eval-") as tmpdir:
+            repo_dir = Path(tmpdir) / "repo"
+            _clone_repo(case, repo_dir)
+            _configure_git_identity(repo_dir)
+
+            config = Config(
+                target=case.target,
+                use_staged=False,
+                dry_run=False,
+                use_ai=use_ai,
+                verbosity=verbosity,
+                cwd=str(repo_dir),
+            )
+
+            plan = build_plan(config)
+            case_report["plan_metrics"] = _plan_metrics(plan)
+
+            apply_plan(plan, config)
+
+            case_report["status"] = "success"
+            case_report["tree_equal"] = True
+    except Exception as exc:  # noqa: BLE001
+        if "plan_metrics" in case_report:
+            case_report["status"] = "apply_failed"
+        else:
+            case_report["status"] = "plan_build_failed"
+        case_report["tree_equal"] = False
+        case_report["error"] = str(exc)
+
+    return case_report
+
+
 def write_evaluation_report(report: Dict[str, Any], output_path: str) -> None:
     """
     Persist a report as formatted JSON.
@@ -224,7 +250,11 @@ def write_evaluation_report(report: Dict[str, Any], output_path: str) -> None:
     path = Path(output_path)
     if path.parent and not path.parent.exists():
         path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+    # json.dump streams to the file instead of building the whole
+    # document as one string first.
+    with path.open("w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2, sort_keys=True)
+        handle.write("\n")
 
 
 def print_evaluation_summary(report: Dict[str, Any], out: Optional[TextIO] = None) -> None:
@@ -262,7 +292,10 @@ def print_evaluation_summary(report: Dict[str, Any], out: Optional[TextIO] = Non
 
 
 def _clone_repo(case: EvalCase, dest: Path) -> None:
-    cmd = ["git", "clone", "--depth", str(case.clone_depth)]
+    # Blobless partial clone: history and trees come down with the clone,
+    # file contents only for the commits a case actually checks out or
+    # diffs. Servers without filter support ignore the option.
+    cmd = ["git", "clone", "--depth", str(case.clone_depth), "--filter=blob:none"]
     if case.branch:
         cmd.extend(["--branch", case.branch])
     cmd.extend([case.repo_url, str(dest)])
@@ -291,16 +324,6 @@ def _run_subprocess(cmd: List[str], cwd: Optional[Path]) -> subprocess.Completed
     return completed
 
 
-@contextmanager
-def _pushd(path: Path) -> Iterator[None]:
-    original = Path.cwd()
-    os.chdir(path)
-    try:
-        yield
-    finally:
-        os.chdir(original)
-
-
 def _ratio(numerator: float, denominator: float) -> float:
     if denominator == 0:
         return 0.0
@@ -308,10 +331,7 @@ def _ratio(numerator: float, denominator: float) -> float:
 
 
 def _plan_metrics(plan: Plan) -> Dict[str, Any]:
-    hunk_map: Dict[str, DiffHunk] = {}
-    for file in plan.diff.files:
-        for hunk in file.hunks:
-            hunk_map[hunk.id] = hunk
+    hunk_index = plan.get_hunk_index()
 
     suggested_count = len(plan.suggested_commits)
     total_hunks = 0
@@ -321,26 +341,55 @@ def _plan_metrics(plan: Plan) -> Dict[str, Any]:
     cohesion_sum = 0.0
 
     for commit in plan.suggested_commits:
-        hunks = [hunk_map[hid] for hid in commit.hunk_ids if hid in hunk_map]
-        total_hunks += len(hunks)
-
-        unique_files = {h.file_path for h in hunks}
-        unique_symbols = {
-            h.meta.get("symbol")
-            for h in hunks
-            if isinstance(h.meta.get("symbol"), str) and h.meta.get("symbol")
-        }
-        total_files += len(unique_files)
-
-        if len(unique_files) <= 1:
+        # Single pass over the commit's hunks. The common single-file,
+        # single-symbol commit never allocates a set: a second distinct
+        # file switches to set-based counting, a second distinct symbol
+        # just flips a flag.
+        first_file: Optional[str] = None
+        seen_files: Optional[Set[str]] = None
+        first_symbol: Optional[str] = None
+        multi_symbol = False
+
+        for hid in commit.hunk_ids:
+            ref = hunk_index.get(hid)
+            if ref is None:
+                continue
+            hunk = ref.hunk
+            total_hunks += 1
+
+            path = hunk.file_path
+            if first_file is None:
+                first_file = path
+            elif seen_files is not None:
+                seen_files.add(path)
+            elif path != first_file:
+                seen_files = {first_file, path}
+
+            if not multi_symbol:
+                symbol = hunk.meta.get("symbol")
+                if isinstance(symbol, str) and symbol:
+                    if first_symbol is None:
+                        first_symbol = symbol
+                    elif symbol != first_symbol:
+                        multi_symbol = True
+
+        if seen_files is not None:
+            file_count = len(seen_files)
+        else:
+            file_count = 0 if first_file is None else 1
+        total_files += file_count
+
+        single_file = file_count <= 1
+        single_symbol = not multi_symbol
+        if single_file:
             single_file_commits += 1
-        if len(unique_symbols) <= 1:
+        if single_symbol:
             single_symbol_commits += 1
 
         cohesion = 0.0
-        if len(unique_files) <= 1:
+        if single_file:
             cohesion += 0.5
-        if len(unique_symbols) <= 1:
+        if single_symbol:
             cohesion += 0.5
         cohesion_sum += cohesion
 
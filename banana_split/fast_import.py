@@ -0,0 +1,368 @@
+"""
+Creation of a plan's commits with a single `git fast-import` run.
+
+The patch-based path in apply.py runs `git apply` and `git commit` for
+every suggested commit. Here the content of each touched file after
+each commit is reconstructed in memory instead: from the file's base
+blob plus the hunks applied so far, or directly from the target tree
+once all of a file's hunks are in. The whole commit chain is then
+streamed to one fast-import process.
+
+fast-import writes commit objects directly, so it does not run commit
+hooks, sign commits or apply a configured commit.cleanup mode. When the
+repository uses any of these the caller is told to take the patch path,
+which goes through `git commit`; otherwise messages get the same
+whitespace cleanup `git commit -m` applies and the same author and
+committer identities.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from .domain import DiffHunk, FileDiff, HunkRef, Plan, SuggestedCommit
+from .errors import GitError, UnsupportedOperationError
+from .git_adapter import (
+    fast_import,
+    get_author_ident,
+    get_committer_ident,
+    get_config,
+    list_commit_hooks,
+    list_tree_entries,
+    read_blobs,
+)
+
+LOG = logging.getLogger(__name__)
+
+_DEFAULT_MODE = "100644"
+_GITLINK_MODE = "160000"
+
+
+class _FileCommand(NamedTuple):
+    """
+    One file change in a fast-import commit.
+
+    A command with mode None deletes the path. Otherwise the path is set
+    either to an existing object (object_id) or to inline content.
+    """
+
+    path: str
+    mode: Optional[str] = None
+    object_id: Optional[str] = None
+    content: Optional[bytes] = None
+
+
+def build_commit_chain(plan: Plan, branch: str, cwd: Optional[str] = None) -> int:
+    """
+    Create the plan's commits on refs/heads/<branch> with one fast-import run.
+
+    The branch must already point at the diff's base commit. The last
+    commit is given the target tree exactly, including changes without
+    hunks (binary files, pure renames, mode changes). Returns the number
+    of commits created.
+
+    Raises UnsupportedOperationError, leaving the branch untouched, when
+    the repository relies on `git commit` behaviour (see the module
+    docstring), when a commit's content cannot be reconstructed from the
+    diff, when the git lookups it needs fail, or when fast-import itself
+    fails (for example when it is unavailable); callers should fall back
+    to applying patches in that case.
+    """
+
+    base = plan.diff.base_commit
+    target = plan.diff.target_commit
+    if not base or not target:
+        raise UnsupportedOperationError("fast-import needs both base and target commits")
+
+    try:
+        _check_plain_commits(cwd)
+        steps = _plan_file_commands(plan, base, target, cwd)
+        if not steps:
+            return 0
+        author = get_author_ident(cwd=cwd)
+        committer = get_committer_ident(cwd=cwd)
+    except GitError as exc:
+        # Nothing has been written yet; the patch path may still succeed.
+        raise UnsupportedOperationError(f"cannot prepare fast-import: {exc}") from exc
+
+    try:
+        fast_import(_iter_stream(branch, base, author, committer, steps), cwd=cwd)
+    except GitError as exc:
+        # fast-import only moves refs after a successful import, so the
+        # branch still points at base and the caller can fall back.
+        raise UnsupportedOperationError(f"git fast-import failed: {exc}") from exc
+    return len(steps)
+
+
+def _check_plain_commits(cwd: Optional[str]) -> None:
+    """
+    Raise UnsupportedOperationError when `git commit` would do more than fast-import.
+    """
+
+    hooks = list_commit_hooks(cwd=cwd)
+    if hooks:
+        raise UnsupportedOperationError(f"commit hooks are installed: {', '.join(hooks)}")
+    if get_config("commit.gpgSign", value_type="bool", cwd=cwd) == "true":
+        raise UnsupportedOperationError("commit.gpgSign is enabled")
+    if get_config("commit.cleanup", cwd=cwd) not in ("", "default", "whitespace"):
+        raise UnsupportedOperationError("commit.cleanup is configured")
+
+
+def _plan_file_commands(
+    plan: Plan,
+    base: str,
+    target: str,
+    cwd: Optional[str],
+) -> List[Tuple[SuggestedCommit, List[_FileCommand]]]:
+    """
+    Work out the file commands for every commit that applies hunks.
+    """
+
+    hunk_index = plan.get_hunk_index()
+
+    # For each commit: every file it touches, with either the sorted
+    # hunks applied to that file so far or None once the file is complete.
+    applied: Dict[int, List[HunkRef]] = {}
+    completed: Set[int] = set()
+    steps: List[Tuple[SuggestedCommit, List[Tuple[FileDiff, Optional[List[HunkRef]]]]]] = []
+
+    for commit in plan.suggested_commits:
+        refs = [hunk_index[hid] for hid in commit.hunk_ids if hid in hunk_index]
+        if not refs:
+            if commit.hunk_ids:
+                LOG.warning("Commit %s references no known hunks; skipping", commit.id)
+            continue
+
+        touched: Dict[int, FileDiff] = {}
+        for ref in refs:
+            applied.setdefault(id(ref.file), []).append(ref)
+            touched[id(ref.file)] = ref.file
+
+        states: List[Tuple[FileDiff, Optional[List[HunkRef]]]] = []
+        for key, file in touched.items():
+            so_far = applied[key]
+            if len(so_far) >= len(file.hunks):
+                completed.add(key)
+                states.append((file, None))
+            else:
+                states.append((file, sorted(so_far, key=lambda ref: ref.order)))
+        steps.append((commit, states))
+
+    if not steps:
+        return []
+
+    # The last commit also brings every remaining file to its target state.
+    steps[-1][1].extend(
+        (file, None) for file in plan.diff.files if id(file) not in completed
+    )
+
+    target_entries = list_tree_entries(
+        target,
+        sorted({file.path_new for file in plan.diff.files if file.path_new}),
+        cwd=cwd,
+    )
+    base_files = {
+        _old_path(file): file
+        for _, states in steps
+        for file, hunks in states
+        if hunks is not None and file.change_type != "add"
+    }
+    base_entries = list_tree_entries(base, sorted(base_files), cwd=cwd)
+    for path, (mode, _) in base_entries.items():
+        if mode == _GITLINK_MODE:
+            raise UnsupportedOperationError(f"cannot partially apply submodule {path}")
+    missing = sorted(set(base_files) - set(base_entries))
+    if missing:
+        raise UnsupportedOperationError(f"files missing from base commit: {', '.join(missing)}")
+    base_paths = sorted(base_entries)
+    base_contents = dict(
+        zip(base_paths, read_blobs([base_entries[path][1] for path in base_paths], cwd=cwd))
+    )
+
+    result: List[Tuple[SuggestedCommit, List[_FileCommand]]] = []
+    for commit, states in steps:
+        commands: List[_FileCommand] = []
+        for file, hunks in states:
+            if hunks is None:
+                commands.extend(_target_commands(file, target_entries))
+                continue
+
+            old_path = _old_path(file)
+            new_path = _new_path(file)
+            if file.change_type == "add":
+                mode = target_entries.get(new_path, (_DEFAULT_MODE, ""))[0]
+                original = b""
+            else:
+                mode = base_entries[old_path][0]
+                original = base_contents[old_path]
+
+            if file.change_type == "rename" and old_path != new_path:
+                commands.append(_FileCommand(old_path))
+            content = _apply_hunks(original, [ref.hunk for ref in hunks], new_path)
+            commands.append(_FileCommand(new_path, mode, content=content))
+        result.append((commit, commands))
+    return result
+
+
+def _target_commands(
+    file: FileDiff,
+    target_entries: Dict[str, Tuple[str, str]],
+) -> List[_FileCommand]:
+    """
+    Commands that give a file exactly its state in the target commit.
+    """
+
+    old_path = _old_path(file)
+    new_path = _new_path(file)
+    if file.change_type == "delete":
+        return [_FileCommand(old_path)]
+
+    commands: List[_FileCommand] = []
+    if file.change_type == "rename" and old_path != new_path:
+        commands.append(_FileCommand(old_path))
+
+    entry = target_entries.get(new_path)
+    if entry is None:
+        raise UnsupportedOperationError(f"{new_path} not found in target commit")
+    mode, object_id = entry
+    commands.append(_FileCommand(new_path, mode, object_id=object_id))
+    return commands
+
+
+def _apply_hunks(original: bytes, hunks: Sequence[DiffHunk], path: str) -> bytes:
+    """
+    Apply hunks, given in file order and in base-file coordinates, to original.
+
+    Context and removed lines must match the original exactly; otherwise
+    UnsupportedOperationError is raised.
+    """
+
+    lines = original.split(b"\n")
+    tail = lines.pop()
+    lines = [line + b"\n" for line in lines]
+    if tail:
+        # Last line without a trailing newline.
+        lines.append(tail)
+
+    out: List[bytes] = []
+    pos = 0
+    for hunk in hunks:
+        if not hunk.lines:
+            # Without its lines (e.g. a metadata-only parse) the hunk's
+            # change cannot be reproduced in an intermediate commit.
+            raise UnsupportedOperationError(f"hunk {hunk.id} has no lines in {path}")
+
+        old_start = hunk.lines[0].original_lineno
+        if old_start is None:
+            raise UnsupportedOperationError(f"unparsable hunk header in {path}: {hunk.header}")
+        old_count = sum(1 for line in hunk.lines if line.line_type != "+")
+        # A hunk that removes nothing inserts after line old_start.
+        start = old_start - 1 if old_count else old_start
+        if start < pos or start + old_count > len(lines):
+            raise UnsupportedOperationError(f"hunk {hunk.id} does not fit {path}")
+
+        out.extend(lines[pos:start])
+        cursor = start
+        for line in hunk.lines:
+            content = line.content.encode("utf-8", "surrogateescape")
+            if line.line_type == "+":
+                out.append(content + b"\n")
+                continue
+
+            existing = lines[cursor]
+            if (existing[:-1] if existing.endswith(b"\n") else existing) != content:
+                raise UnsupportedOperationError(f"hunk {hunk.id} does not match {path}")
+            if line.line_type == " ":
+                out.append(existing)
+            cursor += 1
+        pos = cursor
+
+    out.extend(lines[pos:])
+    return b"".join(out)
+
+
+def _iter_stream(
+    branch: str,
+    base: str,
+    author: str,
+    committer: str,
+    steps: List[Tuple[SuggestedCommit, List[_FileCommand]]],
+) -> Iterator[bytes]:
+    """
+    Yield the fast-import commands for the commit chain, one chunk at a time.
+    """
+
+    ref = f"refs/heads/{branch}"
+    for position, (commit, commands) in enumerate(steps):
+        message = commit.title
+        if commit.body:
+            message = f"{commit.title}\n\n{commit.body}"
+        message_bytes = _clean_message(message).encode("utf-8")
+
+        header = (
+            f"commit {ref}\nauthor {author}\ncommitter {committer}\n"
+            f"data {len(message_bytes)}\n"
+        )
+        yield header.encode("utf-8") + message_bytes + b"\n"
+        if position == 0:
+            yield f"from {base}\n".encode("ascii")
+
+        for command in commands:
+            path = _quote_path(command.path).encode("utf-8", "surrogateescape")
+            if command.mode is None:
+                yield b"D " + path + b"\n"
+            elif command.object_id is not None:
+                yield f"M {command.mode} {command.object_id} ".encode("ascii") + path + b"\n"
+            else:
+                content = command.content or b""
+                yield (
+                    f"M {command.mode} inline ".encode("ascii")
+                    + path
+                    + f"\ndata {len(content)}\n".encode("ascii")
+                    + content
+                    + b"\n"
+                )
+        yield b"\n"
+
+
+def _clean_message(message: str) -> str:
+    """
+    Normalize whitespace the way `git commit -m` does by default.
+
+    Trailing whitespace is stripped from every line, leading and trailing
+    blank lines are dropped, runs of blank lines are collapsed and the
+    message ends with a newline.
+    """
+
+    lines: List[str] = []
+    pending_blank = False
+    for line in message.split("\n"):
+        line = line.rstrip(" \t\r")
+        if not line:
+            pending_blank = bool(lines)
+            continue
+        if pending_blank:
+            lines.append("")
+            pending_blank = False
+        lines.append(line)
+    return "".join(f"{line}\n" for line in lines)
+
+
+def _quote_path(path: str) -> str:
+    """
+    Quote a path for fast-import when it cannot be written verbatim.
+    """
+
+    if not path.startswith('"') and "\n" not in path:
+        return path
+    escaped = path.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'"{escaped}"'
+
+
+def _old_path(file: FileDiff) -> str:
+    return file.path_old or file.path_new or ""
+
+
+def _new_path(file: FileDiff) -> str:
+    return file.path_new or file.path_old or ""
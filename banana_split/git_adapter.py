@@ -2,18 +2,25 @@
 Git integration for banana-split.
 
 This module is responsible for interacting with the git CLI to obtain
-diffs and to apply patches and create commits.
+diffs and to apply patches and create commits. Every public function
+accepts an optional `cwd`: the repository directory to run git in
+(default: the process's current working directory).
 """
 
 from __future__ import annotations
 
 import logging
+import os
 import subprocess
+import threading
 from dataclasses import dataclass
-from typing import Optional
+from typing import AnyStr, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
 from .errors import GitError
 
+# Hooks that `git commit` runs and `git fast-import` does not.
+_COMMIT_HOOKS = ("pre-commit", "prepare-commit-msg", "commit-msg", "post-commit")
+
 LOG = logging.getLogger(__name__)
 
 
@@ -57,17 +64,133 @@ def _run_git(
     except OSError as exc:  # noqa: BLE001
         raise GitError(f"failed to execute git: {exc}") from exc
 
+    _check_returncode(cmd, completed.returncode, completed.stdout, completed.stderr)
+    return completed
+
+
+def _run_git_bytes(
+    args: list[str],
+    input_bytes: Optional[bytes] = None,
+    cwd: Optional[str] = None,
+) -> bytes:
+    """
+    Run a git command with binary stdin/stdout and return its stdout.
+
+    Used where output carries raw object contents or NUL-separated paths.
+    """
+
+    cmd = ["git", *args]
+    LOG.debug("Running git command: %s", " ".join(cmd))
+    try:
+        completed = subprocess.run(
+            cmd,
+            cwd=cwd,
+            check=False,
+            capture_output=True,
+            input=input_bytes,
+        )
+    except OSError as exc:  # noqa: BLE001
+        raise GitError(f"failed to execute git: {exc}") from exc
+
     if completed.returncode != 0:
-        LOG.debug("git stderr: %s", completed.stderr)
-        stderr = (completed.stderr or "").strip()
-        stdout = (completed.stdout or "").strip()
-        detail = stderr or stdout or "no command output"
-        raise GitError(f"git command failed: {' '.join(cmd)}: {detail}")
+        _check_returncode(
+            cmd,
+            completed.returncode,
+            completed.stdout.decode("utf-8", "replace"),
+            completed.stderr.decode("utf-8", "replace"),
+        )
+    return completed.stdout
 
-    return completed
 
+def _run_git_streaming(
+    args: list[str],
+    chunks: Iterable[AnyStr],
+    cwd: Optional[str] = None,
+    text: bool = True,
+) -> None:
+    """
+    Run a git command, writing chunks to its stdin as they are produced.
 
-def get_diff_for_commit(commit: str) -> GitDiffResult:
+    This avoids materializing large inputs (such as patches) in memory.
+    Chunks are str when text is True and bytes otherwise. Errors are
+    reported the same way as in _run_git.
+    """
+
+    cmd = ["git", *args]
+    LOG.debug("Running git command (streaming stdin): %s", " ".join(cmd))
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            cwd=cwd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=text,
+        )
+    except OSError as exc:  # noqa: BLE001
+        raise GitError(f"failed to execute git: {exc}") from exc
+
+    # Drain stdout/stderr while writing: git may produce output before it
+    # has consumed all of its input, and a full output pipe would otherwise
+    # block it while we block on a full stdin pipe.
+    output: Dict[str, AnyStr] = {}
+    readers = [
+        threading.Thread(target=_drain_pipe, args=(proc.stdout, output, "stdout"), daemon=True),
+        threading.Thread(target=_drain_pipe, args=(proc.stderr, output, "stderr"), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    assert proc.stdin is not None
+    try:
+        for chunk in chunks:
+            proc.stdin.write(chunk)
+    except BrokenPipeError:
+        # git exited early; its stderr explains why.
+        pass
+    except BaseException:
+        proc.kill()
+        _finish_streaming(proc, readers)
+        raise
+
+    _finish_streaming(proc, readers)
+    stdout, stderr = output.get("stdout"), output.get("stderr")
+    if not text:
+        stdout = (stdout or b"").decode("utf-8", "replace")
+        stderr = (stderr or b"").decode("utf-8", "replace")
+    _check_returncode(cmd, proc.returncode, stdout, stderr)
+
+
+def _drain_pipe(pipe, output: Dict[str, AnyStr], key: str) -> None:
+    output[key] = pipe.read()
+    pipe.close()
+
+
+def _finish_streaming(proc: subprocess.Popen, readers: List[threading.Thread]) -> None:
+    try:
+        proc.stdin.close()
+    except BrokenPipeError:
+        pass
+    for reader in readers:
+        reader.join()
+    proc.wait()
+
+
+def _check_returncode(
+    cmd: list[str],
+    returncode: int,
+    stdout: Optional[str],
+    stderr: Optional[str],
+) -> None:
+    if returncode == 0:
+        return
+
+    LOG.debug("git stderr: %s", stderr)
+    detail = (stderr or "").strip() or (stdout or "").strip() or "no command output"
+    raise GitError(f"git command failed: {' '.join(cmd)}: {detail}")
+
+
+def get_diff_for_commit(commit: str, cwd: Optional[str] = None) -> GitDiffResult:
     """
     Return the unified diff and metadata for a single commit.
 
@@ -76,39 +199,49 @@ def get_diff_for_commit(commit: str) -> GitDiffResult:
     parents), the diff is taken against the empty tree.
     """
 
-    target = _run_git(["rev-parse", commit]).stdout.strip()
+    # One rev-parse resolves the commit and lists its parents ("<rev>^@"
+    # expands to nothing for root commits and shallow boundaries).
+    resolved = _run_git(["rev-parse", commit, f"{commit}^@"], cwd=cwd).stdout.split()
+    target = resolved[0]
 
-    try:
-        base = _run_git(["rev-parse", f"{target}^"]).stdout.strip()
+    base: Optional[str]
+    if len(resolved) > 1:
+        base = resolved[1]
         diff_args = ["diff", "--find-renames", f"{base}..{target}"]
-    except GitError:
-        # The commit likely has no parents (root commit). Compare
-        # against the empty tree.
+    else:
+        # The commit has no parents (root commit). Compare against the
+        # empty tree.
         base = None
         diff_args = ["diff", "--root", "--find-renames", target]
 
-    diff_output = _run_git(diff_args).stdout
+    diff_output = _run_git(diff_args, cwd=cwd).stdout
     return GitDiffResult(raw_diff=diff_output, base_commit=base, target_commit=target)
 
 
-def get_diff_for_staged() -> GitDiffResult:
+def get_diff_for_staged(cwd: Optional[str] = None) -> GitDiffResult:
     """
     Return the unified diff and metadata for staged changes.
 
     The base commit is HEAD; the target tree is the index.
     """
 
-    base = _run_git(["rev-parse", "HEAD"]).stdout.strip()
-    diff_output = _run_git(["diff", "--cached", "--find-renames"]).stdout
+    base = _run_git(["rev-parse", "HEAD"], cwd=cwd).stdout.strip()
+    diff_output = _run_git(["diff", "--cached", "--find-renames"], cwd=cwd).stdout
     return GitDiffResult(raw_diff=diff_output, base_commit=base, target_commit=None)
 
 
-def apply_patch(patch: str, index_only: bool = False) -> None:
+def apply_patch(
+    patch: Union[str, Iterable[str]],
+    index_only: bool = False,
+    cwd: Optional[str] = None,
+) -> None:
     """
     Apply a unified diff patch to the current repository.
 
-    When index_only is True, the patch is applied to the index without
-    touching the working tree.
+    The patch may be a string or an iterable of string chunks; chunks
+    are streamed to git without being joined first. When index_only is
+    True, the patch is applied to the index without touching the
+    working tree.
     """
 
     args = ["apply"]
@@ -118,43 +251,164 @@ def apply_patch(patch: str, index_only: bool = False) -> None:
 
     # Feed the patch via stdin. We rely on git to validate the patch and
     # will raise GitError if it fails.
-    _run_git(args, cwd=None, input_text=patch)
+    if isinstance(patch, str):
+        _run_git(args, cwd=cwd, input_text=patch)
+    else:
+        _run_git_streaming(args, patch, cwd=cwd)
 
 
-def create_commit(message: str) -> None:
+def list_tree_entries(
+    tree_ish: str,
+    paths: Sequence[str],
+    cwd: Optional[str] = None,
+) -> Dict[str, Tuple[str, str]]:
+    """
+    Return {path: (mode, object_id)} for the given paths in tree_ish.
+
+    Paths are repository-relative and matched literally. Paths that do
+    not exist in the tree are absent from the result.
+
+    The whole tree is listed once and filtered here: passing the paths as
+    pathspecs would put them all on the command line, which overflows the
+    argument limit for large diffs.
+    """
+
+    if not paths:
+        return {}
+
+    wanted = set(paths)
+    output = _run_git_bytes(["ls-tree", "-r", "-z", "--full-tree", tree_ish], cwd=cwd)
+    entries: Dict[str, Tuple[str, str]] = {}
+    for record in output.split(b"\0"):
+        if not record:
+            continue
+        meta, _, raw_path = record.partition(b"\t")
+        path = raw_path.decode("utf-8", "surrogateescape")
+        if path in wanted:
+            mode, _type, object_id = meta.decode("ascii").split()
+            entries[path] = (mode, object_id)
+    return entries
+
+
+def read_blobs(object_ids: Sequence[str], cwd: Optional[str] = None) -> List[bytes]:
+    """
+    Return the raw contents of the given objects, in order.
+
+    All objects are read through a single `git cat-file --batch`.
+    """
+
+    if not object_ids:
+        return []
+
+    request = "".join(f"{object_id}\n" for object_id in object_ids).encode("ascii")
+    output = _run_git_bytes(["cat-file", "--batch"], input_bytes=request, cwd=cwd)
+
+    contents: List[bytes] = []
+    pos = 0
+    for object_id in object_ids:
+        header_end = output.index(b"\n", pos)
+        header = output[pos:header_end].split()
+        if len(header) != 3:
+            raise GitError(f"git cat-file could not read object {object_id}")
+        size = int(header[2])
+        start = header_end + 1
+        contents.append(output[start : start + size])
+        # Each object is followed by a newline.
+        pos = start + size + 1
+    return contents
+
+
+def get_committer_ident(cwd: Optional[str] = None) -> str:
+    """
+    Return the committer identity git would use, in raw "name <email> time tz" form.
+    """
+
+    return _run_git(["var", "GIT_COMMITTER_IDENT"], cwd=cwd).stdout.strip()
+
+
+def get_author_ident(cwd: Optional[str] = None) -> str:
+    """
+    Return the author identity git would use, in raw "name <email> time tz" form.
+    """
+
+    return _run_git(["var", "GIT_AUTHOR_IDENT"], cwd=cwd).stdout.strip()
+
+
+def get_config(key: str, value_type: Optional[str] = None, cwd: Optional[str] = None) -> str:
+    """
+    Return a git config value, or an empty string when it is unset.
+
+    value_type is passed as --type (e.g. "bool") so that git returns the
+    value in canonical form.
+    """
+
+    args = ["config", "--default=", "--get", key]
+    if value_type:
+        args.insert(1, f"--type={value_type}")
+    return _run_git(args, cwd=cwd).stdout.strip()
+
+
+def list_commit_hooks(cwd: Optional[str] = None) -> List[str]:
+    """
+    Return the names of the commit hooks git would run, honouring core.hooksPath.
+    """
+
+    args = ["rev-parse"]
+    for name in _COMMIT_HOOKS:
+        args.extend(["--git-path", f"hooks/{name}"])
+    paths = _run_git(args, cwd=cwd).stdout.splitlines()
+    return [
+        name
+        for name, path in zip(_COMMIT_HOOKS, paths)
+        if os.access(os.path.join(cwd or os.curdir, path), os.X_OK)
+    ]
+
+
+def fast_import(stream: Iterable[bytes], cwd: Optional[str] = None) -> None:
+    """
+    Feed a fast-import command stream to `git fast-import`.
+
+    Refs named in the stream are only updated once the whole stream has
+    been imported successfully.
+    """
+
+    _run_git_streaming(["fast-import", "--quiet"], stream, cwd=cwd, text=False)
+
+
+def create_commit(message: str, cwd: Optional[str] = None) -> None:
     """
     Create a git commit with the given commit message.
     """
 
-    _run_git(["commit", "-m", message])
+    _run_git(["commit", "-m", message], cwd=cwd)
 
 
-def create_branch(name: str, start_point: str) -> None:
+def create_branch(name: str, start_point: str, cwd: Optional[str] = None) -> None:
     """
     Create a new branch pointing at start_point.
     """
 
-    _run_git(["branch", name, start_point])
+    _run_git(["branch", name, start_point], cwd=cwd)
 
 
-def delete_branch(name: str, force: bool = False) -> None:
+def delete_branch(name: str, force: bool = False, cwd: Optional[str] = None) -> None:
     """
     Delete a local branch.
     """
 
     mode = "-D" if force else "-d"
-    _run_git(["branch", mode, name])
+    _run_git(["branch", mode, name], cwd=cwd)
 
 
-def checkout(ref: str) -> None:
+def checkout(ref: str, cwd: Optional[str] = None) -> None:
     """
     Check out the given ref.
     """
 
-    _run_git(["checkout", ref])
+    _run_git(["checkout", ref], cwd=cwd)
 
 
-def get_current_ref() -> str:
+def get_current_ref(cwd: Optional[str] = None) -> str:
     """
     Return the current branch name, or HEAD commit when detached.
     """
@@ -163,6 +417,7 @@ def get_current_ref() -> str:
     LOG.debug("Running git command: %s", " ".join(cmd))
     completed = subprocess.run(
         cmd,
+        cwd=cwd,
         check=False,
         text=True,
         capture_output=True,
@@ -176,15 +431,15 @@ def get_current_ref() -> str:
         raise GitError(f"git command failed: {' '.join(cmd)}: {detail}")
 
     # Detached HEAD: fall back to the current commit hash.
-    return _run_git(["rev-parse", "HEAD"]).stdout.strip()
+    return _run_git(["rev-parse", "HEAD"], cwd=cwd).stdout.strip()
 
 
-def ensure_repo_clean() -> None:
+def ensure_repo_clean(cwd: Optional[str] = None) -> None:
     """
     Ensure there are no uncommitted changes before rewriting history.
     """
 
-    status = _run_git(["status", "--porcelain"]).stdout
+    status = _run_git(["status", "--porcelain"], cwd=cwd).stdout
     dirty = [line for line in status.splitlines() if line.strip()]
     if not dirty:
         return
@@ -198,22 +453,13 @@ def ensure_repo_clean() -> None:
     )
 
 
-def trees_equal(a: str, b: str) -> bool:
+def trees_equal(a: str, b: str, cwd: Optional[str] = None) -> bool:
     """
     Return True if the trees for commits a and b are identical.
+
+    Identical trees have identical object ids, so one rev-parse of both
+    trees answers this without diffing anything.
     """
 
-    cmd = ["git", "diff", "--quiet", f"{a}..{b}"]
-    LOG.debug("Running git command (diff for equality): %s", " ".join(cmd))
-    completed = subprocess.run(
-        cmd,
-        check=False,
-        text=True,
-        capture_output=True,
-    )
-    if completed.returncode == 0:
-        return True
-    if completed.returncode == 1:
-        return False
-    detail = (completed.stderr or "").strip() or (completed.stdout or "").strip() or "no command output"
-    raise GitError(f"git diff failed: {' '.join(cmd)}: {detail}")
+    trees = _run_git(["rev-parse", f"{a}^{{tree}}", f"{b}^{{tree}}"], cwd=cwd).stdout.split()
+    return len(trees) == 2 and trees[0] == trees[1]
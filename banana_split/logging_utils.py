@@ -26,6 +26,14 @@ def configure_logging(verbosity: int) -> None:
     else:
         level = logging.DEBUG
 
+    root = logging.getLogger()
+    if root.handlers:
+        # Already configured (repeated runs in one process, or an
+        # embedding application): basicConfig would be a no-op, so only
+        # apply the requested level.
+        root.setLevel(level)
+        return
+
     logging.basicConfig(
         level=level,
         format="%(levelname)s %(name)s: %(message)s",
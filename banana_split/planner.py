@@ -14,7 +14,7 @@ from __future__ import annotations
 import logging
 
 from .config import Config
-from .domain import Plan
+from .domain import HunkRef, Plan, SuggestedCommit
 from .analysis.heuristics import group_hunks
 from .ai.openai_client import OpenAIClient
 from .diff_parser import parse_unified_diff
@@ -36,7 +36,8 @@ def build_plan(config: Config) -> Plan:
     """
 
     git_diff = _obtain_git_diff(config)
-    diff = parse_unified_diff(git_diff.raw_diff)
+    # Dry runs never render patches, so hunk bodies need not be parsed.
+    diff = parse_unified_diff(git_diff.raw_diff, metadata_only=config.dry_run)
     diff.base_commit = git_diff.base_commit
     diff.target_commit = git_diff.target_commit
     validate_runtime_support(config, git_diff, diff)
@@ -48,8 +49,6 @@ def build_plan(config: Config) -> Plan:
         suggested_commits = ai_client.propose_commits(atomic_changes)
     else:
         # Simple default: one commit per atomic change.
-        from .domain import SuggestedCommit  # local import to avoid cycles
-
         suggested_commits = [
             SuggestedCommit(
                 id=change.id,
@@ -81,11 +80,11 @@ def _obtain_git_diff(config: Config) -> GitDiffResult:
 
     if config.use_staged:
         LOG.info("Using staged changes as diff source")
-        return get_diff_for_staged()
+        return get_diff_for_staged(cwd=config.cwd)
 
     target = config.target or "HEAD"
     LOG.info("Using commit %s as diff source", target)
-    return get_diff_for_commit(target)
+    return get_diff_for_commit(target, cwd=config.cwd)
 
 
 def _validate_and_order_plan(plan: Plan) -> None:
@@ -105,59 +104,82 @@ def _validate_and_order_plan(plan: Plan) -> None:
     # Map each hunk id to its file path and a global order index.
     hunk_order: dict[str, int] = {}
     hunk_file: dict[str, str] = {}
-    all_hunk_ids: list[str] = []
+    hunk_index: dict[str, HunkRef] = {}
+    expected_by_file: dict[str, list[int]] = {}
     order_counter = 0
 
     for file in diff.files:
         path = file.path_new or file.path_old or ""
+        expected = expected_by_file.setdefault(path, [])
         for hunk in file.hunks:
-            all_hunk_ids.append(hunk.id)
             hunk_order[hunk.id] = order_counter
             hunk_file[hunk.id] = path
+            hunk_index[hunk.id] = HunkRef(order_counter, file, hunk)
+            expected.append(order_counter)
             order_counter += 1
 
-    # Ensure all referenced hunks exist and that coverage is exact.
-    assigned_ids: list[str] = []
+    # Downstream consumers (metrics, rendering) reuse this index instead
+    # of walking the diff again.
+    plan.hunk_index = hunk_index
+
+    # Ensure all referenced hunks exist and that coverage is exact, in a
+    # single pass: count assignments and fail on the first unknown or
+    # duplicate id.
+    known_ids = frozenset(hunk_order)
+    seen: dict[str, int] = {}
     for commit in suggested_commits:
         for hid in commit.hunk_ids:
-            if hid not in hunk_order:
+            if hid not in known_ids:
                 raise PlanValidationError(f"plan references unknown hunk id {hid}")
-            assigned_ids.append(hid)
-
-    if set(assigned_ids) != set(all_hunk_ids):
-        missing = set(all_hunk_ids) - set(assigned_ids)
-        extra = set(assigned_ids) - set(all_hunk_ids)
+            count = seen.get(hid, 0) + 1
+            if count > 1:
+                raise PlanValidationError(
+                    f"plan assigns at least one hunk to multiple commits ({hid})"
+                )
+            seen[hid] = count
+
+    if len(seen) != len(known_ids):
+        missing = sorted(known_ids - seen.keys())
         raise PlanValidationError(
-            f"plan does not cover hunks exactly once (missing={missing}, extra={extra})"
+            f"plan does not cover hunks exactly once (missing={missing})"
         )
 
-    if len(assigned_ids) != len(set(assigned_ids)):
-        raise PlanValidationError("plan assigns at least one hunk to multiple commits")
-
     # Order commits by the earliest hunk they contain to respect diff order.
-    plan.suggested_commits = sorted(
-        suggested_commits,
-        key=lambda c: min(hunk_order[hid] for hid in c.hunk_ids),
-    )
-
-    # Verify per-file order is preserved across commits.
-    for file in diff.files:
-        path = file.path_new or file.path_old or ""
-        file_hunk_ids = [h.id for h in file.hunks]
-        if not file_hunk_ids:
-            continue
-
-        sequence: list[int] = []
-        for commit in plan.suggested_commits:
-            for hid in commit.hunk_ids:
-                if hunk_file.get(hid) == path:
-                    sequence.append(hunk_order[hid])
-
-        expected = [hunk_order[hid] for hid in file_hunk_ids]
-        if sequence != expected:
-            raise PlanValidationError(
-                f"plan reorders hunks for file {path}; expected {expected}, got {sequence}"
-            )
+    # The key is computed once per commit rather than on every comparison.
+    # Heuristic plans usually arrive in diff order already, in which case
+    # the existing list is kept as is.
+    commit_min = [min(hunk_order[hid] for hid in commit.hunk_ids) for commit in suggested_commits]
+    if any(prev > nxt for prev, nxt in zip(commit_min, commit_min[1:])):
+        keyed = sorted(zip(commit_min, range(len(commit_min))))
+        plan.suggested_commits = [suggested_commits[idx] for _, idx in keyed]
+
+    # Verify per-file order is preserved across commits in one walk over
+    # the ordered commits: each file's hunks must come up exactly in its
+    # expected order. Coverage is already exact, so every expected
+    # sequence is consumed in full.
+    expected_next = {path: iter(expected) for path, expected in expected_by_file.items()}
+    for commit in plan.suggested_commits:
+        for hid in commit.hunk_ids:
+            path = hunk_file[hid]
+            if next(expected_next[path]) != hunk_order[hid]:
+                sequence = [
+                    hunk_order[other]
+                    for ordered in plan.suggested_commits
+                    for other in ordered.hunk_ids
+                    if hunk_file[other] == path
+                ]
+                raise PlanValidationError(
+                    f"plan reorders hunks for file {path}; "
+                    f"expected {expected_by_file[path]}, got {sequence}"
+                )
+
+    # The plan's groupings are final from here on; freeze them.
+    for commit in plan.suggested_commits:
+        commit.hunk_ids = tuple(commit.hunk_ids)
+        commit.atomic_change_ids = tuple(commit.atomic_change_ids)
+    for change in plan.atomic_changes:
+        if not isinstance(change.tags, frozenset):
+            change.tags = frozenset(change.tags)
 
 
 def run_split(config: Config) -> None:
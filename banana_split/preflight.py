@@ -7,7 +7,7 @@ unsupported cases fail fast with actionable errors.
 
 from __future__ import annotations
 
-from typing import List
+from typing import List, Tuple
 
 from .config import Config
 from .domain import Diff, FileDiff
@@ -37,9 +37,7 @@ def validate_runtime_support(config: Config, git_diff: GitDiffResult, diff: Diff
             "splitting root commits is not supported yet; use --dry-run to inspect the plan"
         )
 
-    binary_paths = _binary_file_paths(diff)
-    rename_only_paths = _rename_only_paths(diff)
-    mode_only_paths = _mode_only_paths(diff)
+    binary_paths, rename_only_paths, mode_only_paths = _unsupported_file_paths(diff)
 
     if not (binary_paths or rename_only_paths or mode_only_paths):
         return
@@ -66,21 +64,25 @@ def _display_path(file: FileDiff) -> str:
     return f"{old_path} -> {new_path}"
 
 
-def _binary_file_paths(diff: Diff) -> List[str]:
-    return [_display_path(file) for file in diff.files if file.is_binary]
-
-
-def _rename_only_paths(diff: Diff) -> List[str]:
-    return [
-        _display_path(file)
-        for file in diff.files
-        if file.change_type == "rename" and not file.hunks
-    ]
-
+def _unsupported_file_paths(diff: Diff) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Classify files as binary, rename-only or mode-only in one pass.
+    """
 
-def _mode_only_paths(diff: Diff) -> List[str]:
-    return [
-        _display_path(file)
-        for file in diff.files
-        if file.change_type == "modify" and not file.is_binary and not file.hunks
-    ]
+    binary_paths: List[str] = []
+    rename_only_paths: List[str] = []
+    mode_only_paths: List[str] = []
+    for file in diff.files:
+        if file.hunks and not file.is_binary:
+            # Ordinary text change: nothing to report, skip formatting.
+            continue
+
+        path = _display_path(file)
+        if file.is_binary:
+            binary_paths.append(path)
+        if not file.hunks:
+            if file.change_type == "rename":
+                rename_only_paths.append(path)
+            elif file.change_type == "modify" and not file.is_binary:
+                mode_only_paths.append(path)
+    return binary_paths, rename_only_paths, mode_only_paths
@@ -26,14 +26,17 @@ def review_plan(plan: Plan) -> Plan:
     """
 
     LOG.info("Plan contains %d suggested commits", len(plan.suggested_commits))
-    for idx, commit in enumerate(plan.suggested_commits, start=1):
-        LOG.info(
-            "  [%d] %s (%d hunks) id=%s",
-            idx,
-            commit.title,
-            len(commit.hunk_ids),
-            commit.id,
-        )
+    # Checked once up front so large plans skip per-commit logging calls
+    # entirely at the default verbosity.
+    if LOG.isEnabledFor(logging.INFO):
+        for idx, commit in enumerate(plan.suggested_commits, start=1):
+            LOG.info(
+                "  [%d] %s (%d hunks) id=%s",
+                idx,
+                commit.title,
+                len(commit.hunk_ids),
+                commit.id,
+            )
 
     if not sys.stdin.isatty():
         # Non-interactive environment: return the plan as-is.
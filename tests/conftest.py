@@ -0,0 +1,118 @@
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Tuple
+
+import pytest
+
+# Commits created by the tests, and by banana-split under test, need an
+# identity. Providing it through the environment covers every repository
+# (including clones made by the eval harness) without `git config` calls.
+for _key, _value in {
+    "GIT_AUTHOR_NAME": "banana-split",
+    "GIT_AUTHOR_EMAIL": "banana-split@example.com",
+    "GIT_COMMITTER_NAME": "banana-split",
+    "GIT_COMMITTER_EMAIL": "banana-split@example.com",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+
+def _run_git(args, cwd: Path) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        ["git", *args],
+        cwd=str(cwd),
+        text=True,
+        capture_output=True,
+        check=True,
+    )
+
+
+def _run_git_silent(args, cwd: Path) -> None:
+    # For setup commands whose output is never read: stdout is discarded
+    # rather than piped back, while stderr is kept for failure reports.
+    subprocess.run(
+        ["git", *args],
+        cwd=str(cwd),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+
+
+@pytest.fixture(scope="session")
+def run_git():
+    """
+    The shared git helper, for tests that inspect their own repositories.
+    """
+
+    return _run_git
+
+
+@pytest.fixture(scope="session")
+def run_git_silent():
+    """
+    The shared quiet git helper, for tests that build their own repositories.
+    """
+
+    return _run_git_silent
+
+
+@pytest.fixture(scope="session")
+def template_repo(tmp_path_factory) -> Path:
+    """
+    A tiny repository with two commits, built once per test session:
+      - base: initial version of foo.py
+      - big:  both functions in foo.py changed
+
+    Tests that only read from it (e.g. clone it) may use it directly;
+    tests that create branches or commits should use `python_repo`.
+    """
+
+    repo = tmp_path_factory.mktemp("template") / "repo"
+    repo.mkdir()
+
+    _run_git_silent(["init", "--quiet", "--initial-branch=main"], cwd=repo)
+
+    (repo / "foo.py").write_text(
+        "def foo():\n"
+        "    return 1\n"
+        "\n"
+        "def bar():\n"
+        "    return 1\n"
+    )
+    _run_git_silent(["add", "foo.py"], cwd=repo)
+    _run_git_silent(["commit", "-q", "-m", "base"], cwd=repo)
+
+    (repo / "foo.py").write_text(
+        "def foo():\n"
+        "    return 2\n"
+        "\n"
+        "def bar():\n"
+        "    return 3\n"
+    )
+    _run_git_silent(["commit", "-q", "-am", "big"], cwd=repo)
+    return repo
+
+
+@pytest.fixture(scope="session")
+def template_commits(template_repo) -> Tuple[str, str]:
+    """
+    The (base, big) commit SHAs of `template_repo`, resolved once.
+
+    Copies made by `python_repo` share them.
+    """
+
+    base, head = _run_git(["rev-parse", "HEAD^", "HEAD"], cwd=template_repo).stdout.split()
+    return base, head
+
+
+@pytest.fixture
+def python_repo(template_repo, tmp_path) -> Path:
+    """
+    A private copy of `template_repo` that the test may modify.
+    """
+
+    repo = tmp_path / "repo"
+    shutil.copytree(template_repo, repo)
+    return repo
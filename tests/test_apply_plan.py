@@ -1,7 +1,9 @@
+import pytest
+
 from banana_split.apply import apply_plan
 from banana_split.config import Config
-from banana_split.domain import Diff, Plan
-from banana_split.errors import GitError
+from banana_split.domain import Diff, DiffHunk, DiffLine, FileDiff, Plan, SuggestedCommit
+from banana_split.errors import GitError, UnsupportedOperationError
 
 
 def _make_plan(base_commit, target_commit):
@@ -20,12 +22,8 @@ def test_apply_plan_requires_base_and_target_commits(monkeypatch):
     config = Config(target=None, use_staged=False, dry_run=False, use_ai=False, verbosity=0)
     plan = _make_plan(base_commit=None, target_commit="target")
 
-    try:
+    with pytest.raises(GitError, match="cannot apply plan without both base and target commits"):
         apply_plan(plan, config)
-    except GitError as exc:
-        assert "cannot apply plan without both base and target commits" in str(exc)
-    else:
-        raise AssertionError("expected GitError to be raised")
 
 
 def test_apply_plan_uses_expected_branch_name(monkeypatch):
@@ -41,29 +39,30 @@ def test_apply_plan_uses_expected_branch_name(monkeypatch):
     applied_patches = []
     created_commits = []
 
-    def fake_create_branch(name, start_point):
+    def fake_create_branch(name, start_point, cwd=None):
         created_branches.append((name, start_point))
 
-    def fake_checkout(ref):
+    def fake_checkout(ref, cwd=None):
         checked_out.append(ref)
 
-    def fake_apply_patch(patch, index_only=False):
+    def fake_apply_patch(patch, index_only=False, cwd=None):
         applied_patches.append((patch, index_only))
 
-    def fake_create_commit(message):
+    def fake_create_commit(message, cwd=None):
         created_commits.append(message)
 
-    def fake_trees_equal(a, b):
+    def fake_trees_equal(a, b, cwd=None):
         # For this test, pretend trees are always equal.
         return True
 
-    monkeypatch.setattr("banana_split.apply.ensure_repo_clean", lambda: None)
-    monkeypatch.setattr("banana_split.apply.get_current_ref", lambda: "main")
+    monkeypatch.setattr("banana_split.apply.ensure_repo_clean", lambda cwd=None: None)
+    monkeypatch.setattr("banana_split.apply.get_current_ref", lambda cwd=None: "main")
     monkeypatch.setattr("banana_split.apply.create_branch", fake_create_branch)
     monkeypatch.setattr("banana_split.apply.checkout", fake_checkout)
     monkeypatch.setattr("banana_split.apply.apply_patch", fake_apply_patch)
     monkeypatch.setattr("banana_split.apply.create_commit", fake_create_commit)
     monkeypatch.setattr("banana_split.apply.trees_equal", fake_trees_equal)
+    monkeypatch.setattr("banana_split.apply.build_commit_chain", lambda plan, branch, cwd=None: 0)
 
     apply_plan(plan, config)
 
@@ -82,15 +81,11 @@ def test_apply_plan_requires_clean_repo(monkeypatch):
 
     monkeypatch.setattr(
         "banana_split.apply.ensure_repo_clean",
-        lambda: (_ for _ in ()).throw(GitError("dirty repo")),
+        lambda cwd=None: (_ for _ in ()).throw(GitError("dirty repo")),
     )
 
-    try:
+    with pytest.raises(GitError, match="dirty repo"):
         apply_plan(plan, config)
-    except GitError as exc:
-        assert "dirty repo" in str(exc)
-    else:
-        raise AssertionError("expected GitError to be raised")
 
 
 def test_apply_plan_rolls_back_branch_on_failure(monkeypatch):
@@ -102,29 +97,120 @@ def test_apply_plan_rolls_back_branch_on_failure(monkeypatch):
     checkouts = []
     deleted_branches = []
 
-    monkeypatch.setattr("banana_split.apply.ensure_repo_clean", lambda: None)
-    monkeypatch.setattr("banana_split.apply.get_current_ref", lambda: "feature/start")
-    monkeypatch.setattr("banana_split.apply.create_branch", lambda name, start: None)
+    monkeypatch.setattr("banana_split.apply.ensure_repo_clean", lambda cwd=None: None)
+    monkeypatch.setattr("banana_split.apply.get_current_ref", lambda cwd=None: "feature/start")
+    monkeypatch.setattr("banana_split.apply.create_branch", lambda name, start, cwd=None: None)
 
-    def fake_checkout(ref):
+    def fake_checkout(ref, cwd=None):
         checkouts.append(ref)
 
-    def fake_trees_equal(a, b):
+    def fake_trees_equal(a, b, cwd=None):
         return False
 
-    def fake_delete_branch(name, force=False):
+    def fake_delete_branch(name, force=False, cwd=None):
         deleted_branches.append((name, force))
 
     monkeypatch.setattr("banana_split.apply.checkout", fake_checkout)
     monkeypatch.setattr("banana_split.apply.trees_equal", fake_trees_equal)
     monkeypatch.setattr("banana_split.apply.delete_branch", fake_delete_branch)
+    monkeypatch.setattr("banana_split.apply.build_commit_chain", lambda plan, branch, cwd=None: 0)
 
-    try:
+    with pytest.raises(GitError, match="final tree does not match original commit"):
         apply_plan(plan, config)
-    except GitError as exc:
-        assert "final tree does not match original commit" in str(exc)
-    else:
-        raise AssertionError("expected GitError to be raised")
 
     assert checkouts == [f"banana-split/split-{target_commit[:7]}", "feature/start"]
     assert deleted_branches == [(f"banana-split/split-{target_commit[:7]}", True)]
+
+
+def _make_two_commit_plan(base_commit, target_commit):
+    hunks = [
+        DiffHunk(
+            id=f"foo.py::h{i}",
+            file_path="foo.py",
+            header=f"@@ -{i + 1} +{i + 1} @@",
+            lines=[DiffLine(line_type="+", content=f"x = {i}")],
+        )
+        for i in range(2)
+    ]
+    diff = Diff(
+        base_commit=base_commit,
+        target_commit=target_commit,
+        files=[
+            FileDiff(
+                path_old="foo.py",
+                path_new="foo.py",
+                change_type="modify",
+                is_binary=False,
+                hunks=hunks,
+            )
+        ],
+    )
+    return Plan(
+        diff=diff,
+        suggested_commits=[
+            SuggestedCommit(
+                id=f"c{i}",
+                title=f"commit {i}",
+                body=None,
+                atomic_change_ids=[],
+                hunk_ids=[hunk.id],
+            )
+            for i, hunk in enumerate(hunks)
+        ],
+        invariants_checked=True,
+    )
+
+
+def _patch_path_fakes(monkeypatch, trees_match):
+    applied_patches = []
+    created_commits = []
+    deleted_branches = []
+
+    def unsupported_fast_import(plan, branch, cwd=None):
+        raise UnsupportedOperationError("use the patch path")
+
+    monkeypatch.setattr("banana_split.apply.ensure_repo_clean", lambda cwd=None: None)
+    monkeypatch.setattr("banana_split.apply.get_current_ref", lambda cwd=None: "main")
+    monkeypatch.setattr("banana_split.apply.create_branch", lambda name, start, cwd=None: None)
+    monkeypatch.setattr("banana_split.apply.checkout", lambda ref, cwd=None: None)
+    monkeypatch.setattr("banana_split.apply.build_commit_chain", unsupported_fast_import)
+    monkeypatch.setattr(
+        "banana_split.apply.apply_patch",
+        lambda patch, index_only=False, cwd=None: applied_patches.append("".join(patch)),
+    )
+    monkeypatch.setattr(
+        "banana_split.apply.create_commit",
+        lambda message, cwd=None: created_commits.append(message),
+    )
+    monkeypatch.setattr("banana_split.apply.trees_equal", lambda a, b, cwd=None: trees_match)
+    monkeypatch.setattr(
+        "banana_split.apply.delete_branch",
+        lambda name, force=False, cwd=None: deleted_branches.append(name),
+    )
+    return applied_patches, created_commits, deleted_branches
+
+
+def test_apply_plan_applies_final_commit_as_patch(monkeypatch):
+    config = Config(target=None, use_staged=False, dry_run=False, use_ai=False, verbosity=0)
+    plan = _make_two_commit_plan(base_commit="a" * 40, target_commit="b" * 40)
+    applied_patches, created_commits, _ = _patch_path_fakes(monkeypatch, trees_match=True)
+
+    apply_plan(plan, config)
+
+    assert len(applied_patches) == 2
+    assert "+x = 0" in applied_patches[0]
+    assert "+x = 1" in applied_patches[1]
+    assert created_commits == ["commit 0", "commit 1"]
+
+
+def test_apply_plan_rejects_patch_path_tree_mismatch(monkeypatch):
+    target_commit = "b" * 40
+    config = Config(target=None, use_staged=False, dry_run=False, use_ai=False, verbosity=0)
+    plan = _make_two_commit_plan(base_commit="a" * 40, target_commit=target_commit)
+    _, created_commits, deleted_branches = _patch_path_fakes(monkeypatch, trees_match=False)
+
+    with pytest.raises(GitError, match="final tree does not match original commit"):
+        apply_plan(plan, config)
+
+    assert created_commits == ["commit 0", "commit 1"]
+    assert deleted_branches == [f"banana-split/split-{target_commit[:7]}"]
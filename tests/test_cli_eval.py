@@ -10,11 +10,12 @@ def test_cli_eval_mode_runs_harness(monkeypatch):
         }
     }
 
-    def fake_run_evaluation(*, corpus_path, use_ai, verbosity):
+    def fake_run_evaluation(*, corpus_path, use_ai, verbosity, jobs):
         calls["run"] += 1
         assert corpus_path == "corpus.json"
         assert use_ai is False
         assert verbosity == 0
+        assert jobs == 3
         return report
 
     def fake_print(summary_report):
@@ -26,11 +27,13 @@ def test_cli_eval_mode_runs_harness(monkeypatch):
         assert summary_report is report
         assert output_path == "out.json"
 
-    monkeypatch.setattr("banana_split.cli.run_evaluation", fake_run_evaluation)
-    monkeypatch.setattr("banana_split.cli.print_evaluation_summary", fake_print)
-    monkeypatch.setattr("banana_split.cli.write_evaluation_report", fake_write)
+    monkeypatch.setattr("banana_split.eval.harness.run_evaluation", fake_run_evaluation)
+    monkeypatch.setattr("banana_split.eval.harness.print_evaluation_summary", fake_print)
+    monkeypatch.setattr("banana_split.eval.harness.write_evaluation_report", fake_write)
 
-    exit_code = cli.main(["--eval-corpus", "corpus.json", "--eval-output", "out.json"])
+    exit_code = cli.main(
+        ["--eval-corpus", "corpus.json", "--eval-output", "out.json", "--eval-jobs", "3"]
+    )
     assert exit_code == 0
     assert calls == {"run": 1, "print": 1, "write": 1}
 
@@ -42,9 +45,9 @@ def test_cli_eval_mode_strict_failure_exit(monkeypatch):
             "successful_cases": 1,
         }
     }
-    monkeypatch.setattr("banana_split.cli.run_evaluation", lambda **kwargs: report)
-    monkeypatch.setattr("banana_split.cli.print_evaluation_summary", lambda *args, **kwargs: None)
-    monkeypatch.setattr("banana_split.cli.write_evaluation_report", lambda *args, **kwargs: None)
+    monkeypatch.setattr("banana_split.eval.harness.run_evaluation", lambda **kwargs: report)
+    monkeypatch.setattr("banana_split.eval.harness.print_evaluation_summary", lambda *args, **kwargs: None)
+    monkeypatch.setattr("banana_split.eval.harness.write_evaluation_report", lambda *args, **kwargs: None)
 
     exit_code = cli.main(["--eval-corpus", "corpus.json", "--eval-fail-on-case-failure"])
     assert exit_code == 2
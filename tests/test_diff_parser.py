@@ -1,4 +1,5 @@
 from banana_split.diff_parser import parse_unified_diff, render_partial_diff
+from banana_split.domain import index_hunks
 
 
 def _collect_hunk_ids(diff):
@@ -72,10 +73,10 @@ diff --git a/foo.py b/foo.py
 
     out = render_partial_diff(diff, all_ids)
     # Parsing the rendered diff should give us the same structure
-    # in terms of files and number of hunks.
+    # in terms of files and hunks.
     diff2 = parse_unified_diff(out)
     assert len(diff2.files) == len(diff.files)
-    assert _collect_hunk_ids(diff2)
+    assert _collect_hunk_ids(diff2) == all_ids
 
 
 def test_hunk_meta_language_and_symbol():
@@ -95,3 +96,84 @@ diff --git a/foo.py b/foo.py
     hunk = file.hunks[0]
     assert hunk.meta.get("language") == "python"
     assert hunk.meta.get("symbol") == "def foo"
+
+
+def test_hunk_line_numbers_follow_header_ranges():
+    raw = """\
+diff --git a/foo.py b/foo.py
+--- a/foo.py
++++ b/foo.py
+@@ -10,3 +12,3 @@ def foo
+ a = 1
+-b = 2
++b = 3
+@@ -x +1 @@
++c = 4
+"""
+    diff = parse_unified_diff(raw)
+    first, malformed = diff.files[0].hunks
+    assert [(l.original_lineno, l.new_lineno) for l in first.lines] == [
+        (10, 12),
+        (11, 13),
+        (12, 13),
+    ]
+    assert [(l.original_lineno, l.new_lineno) for l in malformed.lines] == [(None, None)]
+
+
+def test_render_partial_diff_with_hunk_index_matches_full_scan():
+    raw = """\
+diff --git a/foo.py b/foo.py
+--- a/foo.py
++++ b/foo.py
+@@ -1 +1 @@
+-a = 1
++a = 2
+@@ -10 +10 @@
+-b = 1
++b = 2
+diff --git a/bar.py b/bar.py
+--- a/bar.py
++++ b/bar.py
+@@ -1 +1 @@
+-c = 1
++c = 2
+"""
+    diff = parse_unified_diff(raw)
+    index = index_hunks(diff)
+    selected = ["bar.py::h0", "foo.py::h1", "missing::h0"]
+
+    indexed = render_partial_diff(diff, selected, hunk_index=index)
+    assert indexed == render_partial_diff(diff, selected)
+    assert indexed.index("foo.py") < indexed.index("bar.py")
+    assert "a = 2" not in indexed
+
+
+def test_parse_metadata_only_skips_hunk_bodies():
+    raw = """\
+diff --git a/foo.py b/foo.py
+--- a/foo.py
++++ b/foo.py
+@@ -1,2 +1,2 @@ def foo():
+-a = 1
++a = 2
+ b = 3
+@@ -10,1 +10,1 @@ def bar():
+-c = 1
++c = 2
+diff --git a/new.txt b/new.txt
+new file mode 100644
+--- /dev/null
++++ b/new.txt
+@@ -0,0 +1 @@
++hello
+"""
+    full = parse_unified_diff(raw)
+    meta_only = parse_unified_diff(raw, metadata_only=True)
+
+    assert [(f.path_old, f.path_new, f.change_type) for f in meta_only.files] == [
+        (f.path_old, f.path_new, f.change_type) for f in full.files
+    ]
+    assert [(h.id, h.header, h.meta) for f in meta_only.files for h in f.hunks] == [
+        (h.id, h.header, h.meta) for f in full.files for h in f.hunks
+    ]
+    assert all(not h.lines for f in meta_only.files for h in f.hunks)
@@ -1,21 +1,9 @@
 import json
-import subprocess
-from pathlib import Path
 
 from banana_split.domain import Diff, DiffHunk, DiffLine, FileDiff, Plan, SuggestedCommit
 from banana_split.eval.harness import _plan_metrics, load_eval_corpus, run_evaluation
 
 
-def _run_git(args, cwd: Path) -> subprocess.CompletedProcess[str]:
-    return subprocess.run(
-        ["git", *args],
-        cwd=str(cwd),
-        text=True,
-        capture_output=True,
-        check=True,
-    )
-
-
 def test_load_eval_corpus_from_list(tmp_path):
     corpus_path = tmp_path / "corpus.json"
     corpus_path.write_text(
@@ -108,34 +96,11 @@ def test_plan_metrics_computes_size_and_cohesion():
     assert metrics["semantic_cohesion_score_sum"] == 1.0
 
 
-def test_run_evaluation_on_local_repo(tmp_path):
-    source_repo = tmp_path / "source-repo"
-    source_repo.mkdir()
-
-    _run_git(["init"], cwd=source_repo)
-    _run_git(["config", "user.name", "banana-split"], cwd=source_repo)
-    _run_git(["config", "user.email", "banana-split@example.com"], cwd=source_repo)
-
-    (source_repo / "foo.py").write_text(
-        "def foo():\n"
-        "    return 1\n"
-        "\n"
-        "def bar():\n"
-        "    return 1\n"
-    )
-    _run_git(["add", "foo.py"], cwd=source_repo)
-    _run_git(["commit", "-m", "base"], cwd=source_repo)
-
-    (source_repo / "foo.py").write_text(
-        "def foo():\n"
-        "    return 2\n"
-        "\n"
-        "def bar():\n"
-        "    return 3\n"
-    )
-    _run_git(["commit", "-am", "big"], cwd=source_repo)
-
-    head = _run_git(["rev-parse", "HEAD"], cwd=source_repo).stdout.strip()
+def test_run_evaluation_on_local_repo(template_repo, template_commits, tmp_path):
+    # The harness clones the source repository, so the shared template
+    # is never modified.
+    source_repo = template_repo
+    _, head = template_commits
 
     corpus_path = tmp_path / "corpus.json"
     corpus_path.write_text(
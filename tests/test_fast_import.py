@@ -0,0 +1,148 @@
+import pytest
+
+import banana_split.fast_import as fast_import_module
+from banana_split.apply import apply_plan
+from banana_split.config import Config
+from banana_split.domain import DiffHunk
+from banana_split.errors import GitError, UnsupportedOperationError
+from banana_split.planner import build_plan
+
+
+@pytest.fixture
+def split_repo(tmp_path, run_git, run_git_silent):
+    """
+    A repository whose "big" commit changes two far-apart lines of foo.txt,
+    adds new.txt and deletes gone.txt. Returns (repo, head, base_lines).
+    """
+
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    run_git_silent(["init", "--quiet", "--initial-branch=main"], cwd=repo)
+
+    base_lines = [f"line {i}\n" for i in range(1, 31)]
+    (repo / "foo.txt").write_text("".join(base_lines))
+    (repo / "gone.txt").write_text("bye\n")
+    run_git_silent(["add", "."], cwd=repo)
+    run_git_silent(["commit", "-q", "-m", "base"], cwd=repo)
+
+    # Two hunks far apart in foo.txt, plus an added and a deleted file.
+    target_lines = list(base_lines)
+    target_lines[1] = "line 2 changed\n"
+    target_lines[27] = "line 28 changed\n"
+    (repo / "foo.txt").write_text("".join(target_lines))
+    (repo / "new.txt").write_text("hello\n")
+    (repo / "gone.txt").unlink()
+    run_git_silent(["add", "-A"], cwd=repo)
+    run_git_silent(["commit", "-q", "-m", "big"], cwd=repo)
+    head = run_git(["rev-parse", "HEAD"], cwd=repo).stdout.strip()
+    return repo, head, base_lines
+
+
+def test_apply_plan_writes_intermediate_commits_with_fast_import(split_repo, run_git):
+    repo, head, base_lines = split_repo
+
+    config = Config(target=head, cwd=str(repo))
+    plan = build_plan(config)
+    apply_plan(plan, config)
+
+    branch = f"banana-split/split-{head[:7]}"
+    assert run_git(["symbolic-ref", "--short", "HEAD"], cwd=repo).stdout.strip() == branch
+    split_tree, orig_tree = run_git(
+        ["rev-parse", f"{branch}^{{tree}}", f"{head}^{{tree}}"], cwd=repo
+    ).stdout.split()
+    assert split_tree == orig_tree
+
+    commits = run_git(["rev-list", "--reverse", f"{head}^..{branch}"], cwd=repo).stdout.split()
+    assert len(commits) == len(plan.suggested_commits) > 1
+
+    # The commit that applies only the first foo.txt hunk has exactly
+    # that change on top of the base content.
+    first_foo_commit = next(
+        sha
+        for sha in commits
+        if "foo.txt"
+        in run_git(["diff-tree", "--no-commit-id", "--name-only", "-r", sha], cwd=repo).stdout
+    )
+    partial = run_git(["show", f"{first_foo_commit}:foo.txt"], cwd=repo).stdout
+    expected = list(base_lines)
+    expected[1] = "line 2 changed\n"
+    assert partial == "".join(expected)
+
+
+def test_apply_plan_falls_back_to_patches_when_fast_import_fails(split_repo, run_git, monkeypatch):
+    repo, head, _ = split_repo
+
+    def failing_fast_import(stream, cwd=None):
+        raise GitError("git fast-import failed")
+
+    monkeypatch.setattr(fast_import_module, "fast_import", failing_fast_import)
+
+    config = Config(target=head, cwd=str(repo))
+    plan = build_plan(config)
+    apply_plan(plan, config)
+
+    branch = f"banana-split/split-{head[:7]}"
+    split_tree, orig_tree = run_git(
+        ["rev-parse", f"{branch}^{{tree}}", f"{head}^{{tree}}"], cwd=repo
+    ).stdout.split()
+    assert split_tree == orig_tree
+    commits = run_git(["rev-list", f"{head}^..{branch}"], cwd=repo).stdout.split()
+    assert len(commits) == len(plan.suggested_commits)
+
+
+def test_apply_plan_falls_back_to_patches_when_tree_lookup_fails(split_repo, run_git, monkeypatch):
+    repo, head, _ = split_repo
+
+    def failing_list_tree_entries(tree_ish, paths, cwd=None):
+        raise GitError("git ls-tree failed")
+
+    monkeypatch.setattr(fast_import_module, "list_tree_entries", failing_list_tree_entries)
+
+    config = Config(target=head, cwd=str(repo))
+    plan = build_plan(config)
+    apply_plan(plan, config)
+
+    branch = f"banana-split/split-{head[:7]}"
+    split_tree, orig_tree = run_git(
+        ["rev-parse", f"{branch}^{{tree}}", f"{head}^{{tree}}"], cwd=repo
+    ).stdout.split()
+    assert split_tree == orig_tree
+    commits = run_git(["rev-list", f"{head}^..{branch}"], cwd=repo).stdout.split()
+    assert len(commits) == len(plan.suggested_commits)
+
+
+def test_fast_import_commits_keep_author_and_committer(split_repo, run_git, monkeypatch):
+    repo, head, _ = split_repo
+    monkeypatch.setenv("GIT_AUTHOR_NAME", "Auth")
+    monkeypatch.setenv("GIT_COMMITTER_NAME", "Comm")
+
+    config = Config(target=head, cwd=str(repo))
+    apply_plan(build_plan(config), config)
+
+    branch = f"banana-split/split-{head[:7]}"
+    idents = run_git(["log", "--format=%an/%cn", f"{head}^..{branch}"], cwd=repo).stdout.split()
+    assert idents and set(idents) == {"Auth/Comm"}
+
+
+def test_apply_plan_runs_commit_hooks_through_the_patch_path(split_repo, run_git):
+    repo, head, _ = split_repo
+    hook = repo / ".git" / "hooks" / "commit-msg"
+    hook.write_text('#!/bin/sh\nprintf "\\nHooked: yes\\n" >> "$1"\n')
+    hook.chmod(0o755)
+
+    config = Config(target=head, cwd=str(repo))
+    plan = build_plan(config)
+    apply_plan(plan, config)
+
+    branch = f"banana-split/split-{head[:7]}"
+    trailers = run_git(
+        ["log", "--format=%(trailers:key=Hooked,valueonly)", f"{head}^..{branch}"], cwd=repo
+    ).stdout.split()
+    assert trailers == ["yes"] * len(plan.suggested_commits)
+
+
+def test_apply_hunks_rejects_hunks_without_lines():
+    hunk = DiffHunk(id="foo.txt::h0", file_path="foo.txt", header="@@ -2 +2 @@", lines=[])
+
+    with pytest.raises(UnsupportedOperationError, match="has no lines"):
+        fast_import_module._apply_hunks(b"line 1\nline 2\n", [hunk], "foo.txt")
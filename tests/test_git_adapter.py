@@ -1,7 +1,18 @@
 import subprocess
+import threading
+from types import SimpleNamespace
+
+import pytest
 
 from banana_split.errors import GitError
-from banana_split.git_adapter import _run_git, ensure_repo_clean
+from banana_split.git_adapter import (
+    _run_git,
+    _run_git_streaming,
+    apply_patch,
+    ensure_repo_clean,
+    get_diff_for_commit,
+    list_tree_entries,
+)
 
 
 def test_run_git_includes_stderr_details_on_failure(monkeypatch):
@@ -15,31 +26,112 @@ def test_run_git_includes_stderr_details_on_failure(monkeypatch):
 
     monkeypatch.setattr("banana_split.git_adapter.subprocess.run", fake_run)
 
-    try:
+    with pytest.raises(GitError) as excinfo:
         _run_git(["status"])
-    except GitError as exc:
-        message = str(exc)
-        assert "git status" in message
-        assert "fatal: not a git repository" in message
-    else:
-        raise AssertionError("expected GitError to be raised")
+    message = str(excinfo.value)
+    assert "git status" in message
+    assert "fatal: not a git repository" in message
 
 
 def test_ensure_repo_clean_reports_dirty_entries(monkeypatch):
-    class FakeCompleted:
-        def __init__(self, stdout: str):
-            self.stdout = stdout
-
     monkeypatch.setattr(
         "banana_split.git_adapter._run_git",
-        lambda args, cwd=None, input_text=None: FakeCompleted(" M foo.py\n?? tmp.txt\n"),
+        lambda args, cwd=None, input_text=None: SimpleNamespace(stdout=" M foo.py\n?? tmp.txt\n"),
     )
 
-    try:
+    with pytest.raises(GitError) as excinfo:
         ensure_repo_clean()
-    except GitError as exc:
-        message = str(exc)
-        assert "repository has uncommitted changes" in message
-        assert "foo.py" in message
-    else:
-        raise AssertionError("expected GitError to be raised")
+    message = str(excinfo.value)
+    assert "repository has uncommitted changes" in message
+    assert "foo.py" in message
+
+
+def test_apply_patch_streams_chunks_and_reports_failures(tmp_path, monkeypatch):
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    (tmp_path / "foo.txt").write_text("hello\n")
+    subprocess.run(["git", "add", "foo.txt"], cwd=str(tmp_path), check=True)
+    monkeypatch.chdir(tmp_path)
+
+    chunks = iter(
+        [
+            "diff --git a/foo.txt b/foo.txt\n--- a/foo.txt\n+++ b/foo.txt\n",
+            "@@ -1 +1 @@\n-hello\n+world\n",
+        ]
+    )
+    apply_patch(chunks, index_only=True)
+    staged = subprocess.run(
+        ["git", "show", ":foo.txt"],
+        text=True,
+        capture_output=True,
+        check=True,
+    ).stdout
+    assert staged == "world\n"
+
+    with pytest.raises(GitError, match="git apply --cached"):
+        apply_patch(iter(["not a patch\n"]), index_only=True)
+
+
+def test_get_diff_for_commit_resolves_parent_in_one_call(tmp_path):
+    def git(*args):
+        return subprocess.run(
+            ["git", *args],
+            cwd=str(tmp_path),
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+
+    git("init", "-q")
+    (tmp_path / "foo.txt").write_text("hello\n")
+    git("add", "foo.txt")
+    git("commit", "-q", "-m", "root")
+    root = git("rev-parse", "HEAD")
+    (tmp_path / "foo.txt").write_text("world\n")
+    git("commit", "-q", "-am", "change")
+    head = git("rev-parse", "HEAD")
+
+    result = get_diff_for_commit("HEAD", cwd=str(tmp_path))
+    assert (result.base_commit, result.target_commit) == (root, head)
+    assert "+world" in result.raw_diff
+
+    root_result = get_diff_for_commit(root, cwd=str(tmp_path))
+    assert (root_result.base_commit, root_result.target_commit) == (None, root)
+
+
+def test_run_git_streaming_drains_output_while_writing(tmp_path):
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    blob = subprocess.run(
+        ["git", "hash-object", "-w", "--stdin"],
+        cwd=str(tmp_path),
+        input="x" * 4096,
+        text=True,
+        capture_output=True,
+        check=True,
+    ).stdout.strip()
+
+    # cat-file answers each request as it reads it, so both the input and
+    # the output overflow their pipe buffers during the run.
+    chunks = (f"{blob}\n" for _ in range(5000))
+    worker = threading.Thread(
+        target=_run_git_streaming,
+        args=(["cat-file", "--batch"], chunks),
+        kwargs={"cwd": str(tmp_path)},
+        daemon=True,
+    )
+    worker.start()
+    worker.join(timeout=60)
+    assert not worker.is_alive()
+
+
+def test_list_tree_entries_handles_more_paths_than_fit_on_a_command_line(tmp_path):
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    (tmp_path / "dir").mkdir()
+    (tmp_path / "dir" / "foo.txt").write_text("hello\n")
+    subprocess.run(["git", "add", "dir/foo.txt"], cwd=str(tmp_path), check=True)
+    subprocess.run(["git", "commit", "-q", "-m", "root"], cwd=str(tmp_path), check=True)
+
+    missing = [f"missing/{index:05d}/" + "x" * 200 for index in range(12000)]
+    entries = list_tree_entries("HEAD", ["dir/foo.txt", *missing], cwd=str(tmp_path))
+
+    assert list(entries) == ["dir/foo.txt"]
+    assert entries["dir/foo.txt"][0] == "100644"
@@ -1,3 +1,5 @@
+import pytest
+
 from banana_split.analysis.heuristics import group_hunks
 from banana_split.domain import (
     AtomicChange,
@@ -5,6 +7,7 @@ from banana_split.domain import (
     DiffHunk,
     DiffLine,
     FileDiff,
+    HunkRef,
     Plan,
     SuggestedCommit,
 )
@@ -114,6 +117,11 @@ def test_validate_and_order_plan_happy_path():
     _validate_and_order_plan(plan)
     # Should not raise and should preserve the single commit.
     assert len(plan.suggested_commits) == 1
+    assert plan.suggested_commits[0].hunk_ids == ("foo.py::h0",)
+    assert plan.suggested_commits[0].atomic_change_ids == ("foo.py::ac0",)
+    assert plan.hunk_index == {
+        "foo.py::h0": HunkRef(0, diff.files[0], diff.files[0].hunks[0]),
+    }
 
 
 def test_validate_and_order_plan_detects_missing_hunk():
@@ -139,10 +147,28 @@ def test_validate_and_order_plan_detects_missing_hunk():
         invariants_checked=False,
     )
 
-    try:
+    with pytest.raises(PlanValidationError, match="does not cover hunks exactly once"):
+        _validate_and_order_plan(plan)
+
+
+def test_validate_and_order_plan_detects_reordered_hunks():
+    diff = _make_diff_with_two_symbols()
+    suggested_commits = [
+        SuggestedCommit(
+            id="c1",
+            title="Atomic change",
+            body=None,
+            atomic_change_ids=[],
+            hunk_ids=["foo.py::h1", "foo.py::h0"],
+            estimated_risk=None,
+        )
+    ]
+    plan = Plan(
+        diff=diff,
+        atomic_changes=[],
+        suggested_commits=suggested_commits,
+        invariants_checked=False,
+    )
+
+    with pytest.raises(PlanValidationError, match=r"reorders hunks for file foo\.py"):
         _validate_and_order_plan(plan)
-    except PlanValidationError as exc:
-        message = str(exc)
-        assert "does not cover hunks exactly once" in message
-    else:
-        raise AssertionError("expected PlanValidationError to be raised")
@@ -1,5 +1,7 @@
 from typing import Optional
 
+import pytest
+
 from banana_split.config import Config
 from banana_split.domain import Diff, FileDiff
 from banana_split.errors import UnsupportedOperationError
@@ -26,25 +28,17 @@ def _empty_diff() -> Diff:
 
 
 def test_validate_runtime_support_rejects_staged_non_dry_run():
-    try:
+    with pytest.raises(UnsupportedOperationError, match="--staged --dry-run"):
         validate_runtime_support(_config(dry_run=False, use_staged=True), _git_diff(), _empty_diff())
-    except UnsupportedOperationError as exc:
-        assert "--staged --dry-run" in str(exc)
-    else:
-        raise AssertionError("expected UnsupportedOperationError to be raised")
 
 
 def test_validate_runtime_support_rejects_root_commit_for_apply():
-    try:
+    with pytest.raises(UnsupportedOperationError, match="root commits"):
         validate_runtime_support(
             _config(dry_run=False, use_staged=False),
             _git_diff(base=None, target="deadbeef"),
             _empty_diff(),
         )
-    except UnsupportedOperationError as exc:
-        assert "root commits" in str(exc)
-    else:
-        raise AssertionError("expected UnsupportedOperationError to be raised")
 
 
 def test_validate_runtime_support_rejects_binary_changes_for_apply():
@@ -62,14 +56,11 @@ def test_validate_runtime_support_rejects_binary_changes_for_apply():
         ],
     )
 
-    try:
+    with pytest.raises(UnsupportedOperationError) as excinfo:
         validate_runtime_support(_config(), _git_diff(), diff)
-    except UnsupportedOperationError as exc:
-        message = str(exc)
-        assert "binary files" in message
-        assert "blob.bin" in message
-    else:
-        raise AssertionError("expected UnsupportedOperationError to be raised")
+    message = str(excinfo.value)
+    assert "binary files" in message
+    assert "blob.bin" in message
 
 
 def test_validate_runtime_support_rejects_rename_only_changes_for_apply():
@@ -87,14 +78,11 @@ def test_validate_runtime_support_rejects_rename_only_changes_for_apply():
         ],
     )
 
-    try:
+    with pytest.raises(UnsupportedOperationError) as excinfo:
         validate_runtime_support(_config(), _git_diff(), diff)
-    except UnsupportedOperationError as exc:
-        message = str(exc)
-        assert "rename-only changes" in message
-        assert "old.py -> new.py" in message
-    else:
-        raise AssertionError("expected UnsupportedOperationError to be raised")
+    message = str(excinfo.value)
+    assert "rename-only changes" in message
+    assert "old.py -> new.py" in message
 
 
 def test_validate_runtime_support_rejects_mode_only_changes_for_apply():
@@ -112,14 +100,11 @@ def test_validate_runtime_support_rejects_mode_only_changes_for_apply():
         ],
     )
 
-    try:
+    with pytest.raises(UnsupportedOperationError) as excinfo:
         validate_runtime_support(_config(), _git_diff(), diff)
-    except UnsupportedOperationError as exc:
-        message = str(exc)
-        assert "mode-only changes" in message
-        assert "script.sh" in message
-    else:
-        raise AssertionError("expected UnsupportedOperationError to be raised")
+    message = str(excinfo.value)
+    assert "mode-only changes" in message
+    assert "script.sh" in message
 
 
 def test_validate_runtime_support_allows_unsupported_features_in_dry_run():
@@ -39,17 +39,27 @@ def test_cli_on_real_repo(tmp_path):
     repo_url = os.environ["BANANA_SPLIT_REAL_REPO_URL"]
     workdir = tmp_path / "repo"
 
+    # Only HEAD and its parent are needed. Blobs are fetched lazily when
+    # banana-split diffs or reads them.
     subprocess.run(
-        ["git", "clone", "--depth", "50", repo_url, str(workdir)],
+        [
+            "git",
+            "clone",
+            "--depth",
+            "2",
+            "--filter=blob:none",
+            "--single-branch",
+            "--no-tags",
+            repo_url,
+            str(workdir),
+        ],
         text=True,
         capture_output=True,
         check=True,
     )
 
-    # Ensure commits created by banana-split have an identity.
-    _run_git(["config", "user.name", "banana-split"], cwd=workdir)
-    _run_git(["config", "user.email", "banana-split@example.com"], cwd=workdir)
-
+    # Commits created by banana-split take their identity from the
+    # GIT_AUTHOR_*/GIT_COMMITTER_* variables set in conftest.py.
     orig_head = _run_git(["rev-parse", "HEAD"], cwd=workdir).stdout.strip()
 
     project_root = Path(__file__).resolve().parents[1]
@@ -57,7 +67,7 @@ def test_cli_on_real_repo(tmp_path):
     env["PYTHONPATH"] = str(project_root)
 
     subprocess.run(
-        [sys.executable, "-m", "banana_split.cli", orig_head],
+        [sys.executable, "-S", "-m", "banana_split.cli", orig_head],
         cwd=str(workdir),
         env=env,
         text=True,
@@ -67,6 +77,9 @@ def test_cli_on_real_repo(tmp_path):
     split_branch = f"banana-split/split-{orig_head[:7]}"
 
     # The branch should exist and its tree should match the original.
-    _run_git(["rev-parse", split_branch], cwd=workdir)
-    _run_git(["diff", "--quiet", f"{orig_head}..{split_branch}"], cwd=workdir)
+    orig_tree, split_tree = _run_git(
+        ["rev-parse", f"{orig_head}^{{tree}}", f"{split_branch}^{{tree}}"],
+        cwd=workdir,
+    ).stdout.split()
+    assert split_tree == orig_tree
 
@@ -97,3 +97,53 @@ def test_atomizer_module_fallback_orders_source_before_test():
     assert len(atomic_changes) == 2
     assert atomic_changes[0].id == "math.py::ac0"
     assert atomic_changes[1].id == "tests/test_math.py::ac0"
+
+
+def test_atomizer_tags_test_paths():
+    diff = Diff(
+        base_commit="base",
+        target_commit="target",
+        files=[
+            FileDiff(
+                path_old=path,
+                path_new=path,
+                change_type="modify",
+                is_binary=False,
+                hunks=[_hunk(f"{path}::h0", path)],
+            )
+            for path in ("web/app.spec.ts", "pkg/Tests/helpers.py", "pkg/service.py")
+        ],
+    )
+
+    tags_by_id = {ac.id: ac.tags for ac in atomize_semantically(diff)}
+    assert "test" in tags_by_id["web/app.spec.ts::ac0"]
+    assert "test" in tags_by_id["pkg/Tests/helpers.py::ac0"]
+    assert "test" not in tags_by_id["pkg/service.py::ac0"]
+
+
+def test_atomizer_keeps_diff_order_when_sources_precede_tests():
+    def _file(path, symbol):
+        return FileDiff(
+            path_old=path,
+            path_new=path,
+            change_type="modify",
+            is_binary=False,
+            hunks=[_hunk(f"{path}::h0", path, symbol=symbol)],
+        )
+
+    diff = Diff(
+        base_commit="base",
+        target_commit="target",
+        files=[
+            _file("service.py", "def compute"),
+            _file("README.md", None),
+            _file("tests/test_service.py", "def compute"),
+        ],
+    )
+
+    atomic_changes = atomize_semantically(diff)
+    assert [ac.id for ac in atomic_changes] == [
+        "service.py::ac0",
+        "README.md::ac0",
+        "tests/test_service.py::ac0",
+    ]